@@ -1,29 +1,268 @@
+import time
+
+# Açılış süresi ölçümü için modül yükleme başlangıcı
+MODULE_LOAD_START = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from sigma.rule import SigmaRule
-from sigma.collection import SigmaCollection
-from sigma.backends.splunk import SplunkBackend
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import yaml
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
+from pathlib import Path
 import logging
 import urllib.request
 import json
 import re
-import time
 import uuid
+import gzip
+import hashlib
+import os
+import sys
+import argparse
+import threading
+from rule_index import FileListing, InvalidCursorError, RuleEntry, RuleRecord, RuleSnapshot
+from rule_watcher import RuleDirectoryWatcher, is_rule_file
+from rule_store import MappedRuleStore, RuleStoreError, write_rule_store
+from spl_optimizer import QueryItem, logsource_key, merge_queries
+
+# Opsiyonel hızlı JSON encoder ve brotli desteği
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Logging yapılandırması
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Örnek Sigma kuralı (/example ve warm-up için)
+EXAMPLE_SIGMA_RULE = """title: Suspicious Process Creation
+description: Detects suspicious process creation events
+status: experimental
+author: Security Team
+date: 2023/01/01
+logsource:
+    category: process_creation
+    product: windows
+detection:
+    selection:
+        Image|endswith: 
+            - '\\cmd.exe'
+            - '\\powershell.exe'
+        CommandLine|contains: 
+            - 'whoami'
+            - 'net user'
+            - 'tasklist'
+    condition: selection
+falsepositives:
+    - Administrative activities
+level: medium
+tags:
+    - attack.discovery
+    - attack.t1057"""
+
+# Açılış aşamalarının süreleri (saniye) ve hazır olma kontrolleri
+startup_timings: Dict[str, float] = {}
+readiness_checks: Dict[str, bool] = {"sigma_loaded": False, "backend_warm": False}
+startup_report_lock = threading.Lock()
+startup_reported = False
+
+# pySigma modülleri ağır olduğu için ilk kullanımda (veya warm-up aşamasında) yüklenir
+@lru_cache(maxsize=None)
+def get_sigma_modules():
+    """SigmaRule, SigmaCollection ve SplunkBackend sınıflarını yükleyip döndür"""
+    start_time = time.perf_counter()
+    from sigma.rule import SigmaRule
+    from sigma.collection import SigmaCollection
+    from sigma.backends.splunk import SplunkBackend
+    startup_timings.setdefault("sigma_import", time.perf_counter() - start_time)
+    readiness_checks["sigma_loaded"] = True
+    return SigmaRule, SigmaCollection, SplunkBackend
+
+# Sıkıştırma ayarları
+COMPRESSION_MIN_SIZE = 1024  # Bu boyutun altındaki yanıtlar sıkıştırılmaz
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "text/")
+
+# Hızlı JSON serileştirme
+def dump_json(content: Any) -> bytes:
+    """orjson varsa onunla, yoksa kompakt json ile UTF-8 byte'a serileştir"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=str
+    ).encode("utf-8")
+
+# Hızlı JSON yanıt sınıfı
+class FastJSONResponse(JSONResponse):
+    """orjson varsa onunla, yoksa kompakt json ile serileştiren JSON yanıtı"""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+# Accept-Encoding başlığından desteklenen kodlamayı seç
+def select_content_encoding(accept_encoding: str) -> Optional[str]:
+    """İstemcinin kabul ettiği kodlamalardan en uygununu seç (br > gzip)"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        pieces = part.strip().split(";")
+        name = pieces[0].strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in pieces[1:]:
+            param = param.strip()
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+
+    def is_accepted(name: str) -> bool:
+        return accepted.get(name, accepted.get("*", 0.0)) > 0
+
+    if brotli is not None and is_accepted("br"):
+        return "br"
+    if is_accepted("gzip"):
+        return "gzip"
+    return None
+
+# Büyük yanıtlar için gzip/brotli sıkıştırma middleware'i
+# Vary başlığına Accept-Encoding ekle
+def with_vary_accept_encoding(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    vary = b", ".join(value for key, value in headers if key.lower() == b"vary")
+    if b"accept-encoding" in vary.lower() or vary.strip() == b"*":
+        return list(headers)
+    new_headers = [(key, value) for key, value in headers if key.lower() != b"vary"]
+    new_headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+    return new_headers
+
+class CompressionMiddleware:
+    """
+    Eşik değerinin üzerindeki tek parça yanıtları gzip veya brotli ile sıkıştırır.
+    Streaming yanıtlar (birden fazla body parçası) olduğu gibi iletilir.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+
+        encoding = select_content_encoding(accept_encoding)
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = {key.lower(): value for key, value in start_message.get("headers", [])}
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+
+            compressible = content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+
+            if (
+                encoding is None
+                or message.get("more_body", False)
+                or b"content-encoding" in headers
+                or len(body) < self.minimum_size
+                or not compressible
+            ):
+                passthrough = True
+                if compressible:
+                    # Sıkıştırılmamış varyant da paylaşılan önbelleklerde Accept-Encoding'e göre ayrılmalı
+                    start_message = {**start_message, "headers": with_vary_accept_encoding(start_message.get("headers", []))}
+                await send(start_message)
+                await send(message)
+                return
+
+            if encoding == "br":
+                compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+            else:
+                compressed = gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+            new_headers = with_vary_accept_encoding([
+                (key, value) for key, value in start_message.get("headers", [])
+                if key.lower() != b"content-length"
+            ])
+            new_headers.append((b"content-encoding", encoding.encode("latin-1")))
+            new_headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+
+            await send({**start_message, "headers": new_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+# Dosya listesi ayarları
+GITHUB_LISTING_TTL_SECONDS = 300
+LIST_PAGE_DEFAULT_LIMIT = 100
+LIST_PAGE_MAX_LIMIT = 1000
+
+# Arama ayarları (deadline tüm ağ çağrılarına uygulanır)
+SEARCH_TIMEOUT_SECONDS = 60
+URL_READ_CHUNK_SIZE = 64 * 1024
+
+# Kural ID indeksi ayarları
+RULE_INDEX_WORKERS = 16
+RULE_DOWNLOAD_TIMEOUT = 15
+RULE_INDEX_RETRY_SECONDS = 30  # Başarısız oluşturmalar üstel bekleme ile yeniden denenir
+RULE_INDEX_RETRY_MAX_SECONDS = 600
+BUILD_INDEX_ON_STARTUP = os.getenv("SIGMA_BUILD_INDEX_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# Yerel kural dizini ayarları (tanımlıysa kurallar GitHub yerine bu dizinden okunur)
+RULES_DIR = os.getenv("SIGMA_RULES_DIR")
+WATCH_RULES_DIR = os.getenv("SIGMA_WATCH_RULES", "true").lower() in ("1", "true", "yes")
+RULES_DEBOUNCE_SECONDS = 0.5
+
+# Paylaşılan kural deposu ayarları (tanımlıysa worker'lar snapshot'ı kendileri oluşturmaz, bu dosyayı mmap ile okur)
+RULE_STORE_PATH = os.getenv("SIGMA_RULE_STORE")
+RULE_STORE_POLL_SECONDS = 2.0
+
 # FastAPI uygulaması oluştur
 app = FastAPI(
     title="Sigma to Splunk Converter API",
     description="Sigma kurallarını Splunk sorgularına dönüştüren ve GitHub'dan Sigma kuralları arayan REST API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware ekle
@@ -35,6 +274,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Büyük JSON yanıtlarını sıkıştır
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
 # Request modeli
 class SigmaConvertRequest(BaseModel):
     sigma_rule: str
@@ -69,12 +311,15 @@ level: medium""",
 # Sigma search request modeli
 class SigmaSearchRequest(BaseModel):
     target_id: str
+    include_content: bool = True  # False ise kural içeriği yerine referans döner
+    resume_from: Optional[str] = None  # Timeout yanıtındaki resume_cursor; tarama bu dosyadan sonra devam eder
     metadata: Dict[str, Any] = {}
 
     class Config:
         schema_extra = {
             "example": {
                 "target_id": "7efd2c8d-8b18-45b7-947d-adfe9ed04f61",
+                "include_content": True,
                 "metadata": {
                     "request_id": "search-123",
                     "user": "analyst"
@@ -121,6 +366,15 @@ class UUIDCheckResponse(BaseModel):
     uuid_version: Optional[int] = None
     metadata: Dict[str, Any] = {}
 
+# Kural ID önek arama yanıt modeli
+class RuleLookupResponse(BaseModel):
+    success: bool
+    message: str
+    prefix: str
+    matches: List[Dict[str, Any]] = []
+    index_size: int = 0
+    elapsed_ms: float = 0.0
+
 # Basit UUID request modeli (kullanıcının eklediği)
 class UUIDRequest(BaseModel):
     value: str
@@ -134,25 +388,44 @@ def is_valid_uuid(value: str) -> bool:
     except ValueError:
         return False
 
+# GitHub dosya listesi önbelleği: repo_path -> (alınma zamanı, FileListing)
+github_listing_cache: Dict[str, Any] = {}
+
 # GitHub'dan dosya listesi alma fonksiyonu
-def get_github_files(repo_path: str = "rules/windows/process_creation"):
-    """GitHub API'sini kullanarak dosya listesi al"""
+def get_github_files(
+    repo_path: str = "rules/windows/process_creation",
+    use_cache: bool = True,
+    deadline: Optional["SearchDeadline"] = None
+) -> FileListing:
+    """
+    GitHub API'sini kullanarak dosya listesi al (kompakt FileListing olarak, TTL ile önbelleklenir)
+    
+    Deadline verilirse liste okuması da kalan süreyle sınırlanır ve süre dolunca
+    SearchTimeoutError fırlatılır.
+    """
+    cached = github_listing_cache.get(repo_path)
+    if use_cache and cached and time.time() - cached[0] < GITHUB_LISTING_TTL_SECONDS:
+        return cached[1]
+    
     api_url = f"https://api.github.com/repos/SigmaHQ/sigma/contents/{repo_path}"
     
     try:
-        with urllib.request.urlopen(api_url) as response:
-            data = json.loads(response.read().decode('utf-8'))
-            
-        files = []
-        for item in data:
-            if item['type'] == 'file' and item['name'].endswith('.yml'):
-                files.append({
-                    "name": item['name'],
-                    "download_url": item['download_url'],
-                    "size": item['size']
-                })
+        data = json.loads(read_url_text(api_url, deadline))
+        
+        files = FileListing(
+            {
+                "name": item['name'],
+                "download_url": item['download_url'],
+                "size": item['size']
+            }
+            for item in data
+            if item['type'] == 'file' and item['name'].endswith('.yml')
+        )
         
+        github_listing_cache[repo_path] = (time.time(), files)
         return files
+    except SearchTimeoutError:
+        raise
     except Exception as e:
         logger.error(f"GitHub API hatası: {str(e)}")
         raise HTTPException(
@@ -173,52 +446,448 @@ def extract_id_from_content(content: str) -> Optional[str]:
             return id_part
     return None
 
+# Sigma kuralında başlık arama fonksiyonu
+def extract_title_from_content(content: str) -> Optional[str]:
+    """Sigma kural içeriğinden üst seviye başlığı (title) çıkar"""
+    for line in content.splitlines():
+        if line.startswith("title:"):
+            return line.split("title:", 1)[1].strip().strip('\'"').strip()
+    return None
+
+# Kural içeriğini referans ile değiştiren fonksiyon
+def strip_rule_content(found_rule: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Ham kural içeriğini çıkar, yerine download_url ile birlikte hash ve uzunluk bırak"""
+    if not found_rule or "content" not in found_rule:
+        return found_rule
+
+    content_bytes = found_rule["content"].encode("utf-8")
+    stripped = {key: value for key, value in found_rule.items() if key != "content"}
+    stripped["content_sha256"] = hashlib.sha256(content_bytes).hexdigest()
+    stripped["content_length"] = len(content_bytes)
+    return stripped
+
+# Arama süresi dolduğunda fırlatılan hata
+class SearchTimeoutError(Exception):
+    """Arama deadline'ı bir ağ çağrısı sırasında veya dosyalar arasında dolduğunda fırlatılır"""
+
+# Arama deadline'ı
+class SearchDeadline:
+    """Aramanın toplam süresini izler ve her ağ çağrısına kalan süreyi timeout olarak verir"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.started = time.monotonic()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.seconds - self.elapsed())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def io_timeout(self, cap: float = RULE_DOWNLOAD_TIMEOUT) -> float:
+        """Sıradaki ağ çağrısı için timeout; süre dolmuşsa SearchTimeoutError fırlatır"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise SearchTimeoutError(f"Arama {self.seconds} saniye deadline'ını aştı")
+        return min(remaining, cap)
+
+# Açık bir yanıtın soket timeout'unu güncelleyen fonksiyon
+def set_response_timeout(response, timeout: float) -> None:
+    """HTTP(S) yanıtının altındaki soketin timeout'unu değiştir (file:// yanıtlarında soket yoktur)"""
+    sock = getattr(getattr(getattr(response, "fp", None), "raw", None), "_sock", None)
+    if sock is not None:
+        sock.settimeout(timeout)
+
+# URL içeriğini deadline'a uyarak okuyan fonksiyon
+def read_url_text(url: str, deadline: Optional[SearchDeadline] = None) -> str:
+    """
+    URL'i indir ve UTF-8 metin olarak döndür.
+
+    Deadline verilirse her recv'den önce soket timeout'u kalan süreye indirilir ve
+    read1 ile tek recv'lik parçalar okunur; yavaş gönderen bir sunucu da deadline'ı
+    aşamaz, süre dolunca SearchTimeoutError fırlatılır.
+    """
+    timeout = deadline.io_timeout() if deadline else RULE_DOWNLOAD_TIMEOUT
+    chunks = []
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            read_chunk = getattr(response, "read1", response.read)
+            while True:
+                if deadline is not None:
+                    set_response_timeout(response, deadline.io_timeout())
+                chunk = read_chunk(URL_READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError as e:
+        # Bağlantı, başlıklar veya gövde okunurken süre dolduysa
+        if deadline is not None and deadline.expired():
+            raise SearchTimeoutError(f"Arama {deadline.seconds} saniye deadline'ını aştı") from e
+        raise
+    return b"".join(chunks).decode("utf-8")
+
+# İndirilen içerikte target ID'yi kontrol eden fonksiyon
+def match_rule_content(file_info: Dict[str, Any], content: str, target_id: str) -> Optional[Dict[str, Any]]:
+    """İçeriğin ID'si target ID ile eşleşiyorsa bulunan kural kaydını döndür"""
+    current_id = extract_id_from_content(content)
+    if current_id and current_id.lower() == target_id.lower():
+        return {
+            "filename": file_info["name"],
+            "download_url": file_info["download_url"],
+            "content": content,
+            "id": current_id,
+            "file_size": file_info.get("size", 0)
+        }
+    return None
+
 # Dosya indirme ve analiz fonksiyonu
-def download_and_check_file(file_info: Dict[str, Any], target_id: str) -> Optional[Dict[str, Any]]:
-    """Dosyayı indir ve target ID'yi ara"""
+def download_and_check_file(
+    file_info: Dict[str, Any],
+    target_id: str,
+    deadline: Optional[SearchDeadline] = None
+) -> Optional[Dict[str, Any]]:
+    """Dosyayı indir ve target ID'yi ara (deadline dolarsa SearchTimeoutError fırlatır)"""
     try:
-        with urllib.request.urlopen(file_info["download_url"]) as response:
-            content = response.read().decode("utf-8")
-            
-        current_id = extract_id_from_content(content)
-        if current_id and current_id.lower() == target_id.lower():
-            return {
-                "filename": file_info["name"],
-                "download_url": file_info["download_url"],
-                "content": content,
-                "id": current_id,
-                "file_size": file_info.get("size", 0)
-            }
+        content = read_url_text(file_info["download_url"], deadline)
+    except SearchTimeoutError:
+        raise
     except Exception as e:
+        if deadline is not None and deadline.expired():
+            raise SearchTimeoutError(f"Arama {deadline.seconds} saniye deadline'ını aştı") from e
         logger.warning(f"Dosya indirilemedi {file_info['name']}: {str(e)}")
+        return None
     
-    return None
+    return match_rule_content(file_info, content, target_id)
+
+# Kural snapshot'ı (ID indeksi, dosya listesi ve dönüşümler; her güncellemede referans atomik olarak değiştirilir)
+rule_snapshot: Optional[RuleSnapshot] = None
+rule_snapshot_lock = threading.Lock()
+rule_index_lock = threading.Lock()  # Aynı anda yalnızca bir tam yeniden oluşturma
+rule_rescan_pending = threading.Event()  # Süren oluşturma bitince yeniden tarama gerekiyor
+rule_watcher: Optional[RuleDirectoryWatcher] = None
+rule_store_output: Optional[str] = None  # Builder modunda her yayında yazılacak depo dosyası
+rule_index_status: Dict[str, Any] = {
+    "state": "empty",
+    "source": RULES_DIR or "github",
+    "rule_count": 0,
+    "built_at": None,
+    "build_seconds": None,
+    "error": None
+}
+
+# Kural dosyası listesini döndüren fonksiyon
+def get_rule_files(deadline: Optional["SearchDeadline"] = None) -> FileListing:
+    """
+    Yerel kural dizini veya paylaşılan kural deposu tanımlıysa snapshot'taki, değilse
+    GitHub'daki dosya listesini döndür (liste, ID indeksiyle aynı kaynaktan gelir)
+    """
+    if RULES_DIR or RULE_STORE_PATH:
+        current_snapshot = rule_snapshot
+        if current_snapshot is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Kural snapshot'ı henüz yüklenmedi: {RULE_STORE_PATH or RULES_DIR}"
+            )
+        return current_snapshot.files
+    return get_github_files(deadline=deadline)
+
+# Kural içeriğinden snapshot girdisi üreten fonksiyon
+def make_rule_entry(file_info: Dict[str, Any], content: str, precompute: bool) -> RuleEntry:
+    """İçerikten ID/başlık kaydını ve (istenirse) dönüşüm sonucunu hazırla"""
+    rule_id = extract_id_from_content(content)
+    size = file_info.get("size", len(content.encode("utf-8")))
+    record = None
+    if rule_id:
+        record = RuleRecord(
+            rule_id=rule_id,
+            title=extract_title_from_content(content) or "",
+            filename=file_info["name"],
+            download_url=file_info["download_url"],
+            size=size
+        )
+
+    conversion = None
+    if precompute:
+        try:
+            conversion = convert_sigma_rule_text(content, {}).model_dump(mode="json")
+        except HTTPException as e:
+            logger.warning(f"Kural önceden dönüştürülemedi {file_info['name']}: {e.detail}")
+
+    return RuleEntry(
+        filename=file_info["name"],
+        download_url=file_info["download_url"],
+        size=size,
+        record=record,
+        content_sha256=hashlib.sha256(content.encode("utf-8")).hexdigest(),
+        conversion=conversion
+    )
+
+# GitHub dosyasından snapshot girdisi üretme fonksiyonu
+def fetch_rule_entry(file_info: Dict[str, Any]) -> Optional[RuleEntry]:
+    """Dosyayı indir, ID ve başlığını çıkar"""
+    try:
+        content = read_url_text(file_info["download_url"])
+    except Exception as e:
+        logger.warning(f"İndeks için dosya indirilemedi {file_info['name']}: {str(e)}")
+        return None
+
+    return make_rule_entry(file_info, content, precompute=False)
+
+# Yerel kural dosyasından snapshot girdisi üretme fonksiyonu
+def load_local_rule_entry(path: str) -> Optional[RuleEntry]:
+    """Yerel dosyayı oku, ID/başlık kaydını ve dönüşüm sonucunu hazırla (dosya yoksa None)"""
+    try:
+        with open(path, encoding="utf-8") as rule_file:
+            content = rule_file.read()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Kural dosyası okunamadı {path}: {str(e)}")
+        return None
+
+    file_info = {
+        "name": os.path.relpath(path, RULES_DIR),
+        "download_url": Path(path).as_uri(),
+        "size": len(content.encode("utf-8"))
+    }
+    return make_rule_entry(file_info, content, precompute=True)
+
+# Yerel kural dizinindeki tüm kural dosyalarını listeleyen fonksiyon
+def scan_local_rule_paths() -> List[str]:
+    paths = []
+    for root, _, filenames in os.walk(RULES_DIR):
+        paths.extend(os.path.abspath(os.path.join(root, name)) for name in filenames if is_rule_file(name))
+    return paths
+
+# Yeni snapshot'ı yayınlama fonksiyonu
+def publish_rule_snapshot(snapshot: RuleSnapshot, build_seconds: float) -> None:
+    """Snapshot referansını tek atama ile değiştir ve durumu güncelle"""
+    global rule_snapshot
+    if rule_store_output and isinstance(snapshot, RuleSnapshot):
+        store_size = write_rule_store(snapshot, rule_store_output)
+        logger.info(f"Kural deposu yazıldı: {rule_store_output} ({store_size} byte)")
+    rule_snapshot = snapshot
+    rule_index_status.update({
+        "state": "ready",
+        "rule_count": len(snapshot.index),
+        "built_at": snapshot.created_at,
+        "build_seconds": build_seconds,
+        "error": None
+    })
+    startup_timings.setdefault("rule_snapshot", build_seconds)
+    report_startup_if_ready()
+
+# Kural snapshot'ını baştan oluşturma fonksiyonu
+def build_rule_index(rescan_if_running: bool = False) -> None:
+    """
+    Tüm kuralları (GitHub'dan paralel veya yerel dizinden) okuyup snapshot'ı yeniden oluştur.
+
+    Oluşturma sürüyorsa çağrı beklemeden döner; rescan_if_running True ise süren
+    oluşturma bittiğinde bir tarama daha yapılır (araya giren değişiklikler kaybolmaz).
+    """
+    if rescan_if_running:
+        rule_rescan_pending.set()
+
+    while rule_index_lock.acquire(blocking=False):
+        try:
+            rule_rescan_pending.clear()
+            rebuild_rule_snapshot()
+        finally:
+            rule_index_lock.release()
+        if not rule_rescan_pending.is_set():
+            return
+
+    if rescan_if_running:
+        logger.info("Kural indeksi oluşturuluyor; bittiğinde yeniden taranacak")
+    else:
+        logger.info("Kural indeksi zaten oluşturuluyor")
+
+def rebuild_rule_snapshot() -> None:
+    with rule_snapshot_lock:
+        try:
+            rule_index_status.update({"state": "building", "error": None})
+            start_time = time.time()
+
+            with ThreadPoolExecutor(max_workers=RULE_INDEX_WORKERS) as executor:
+                if RULES_DIR:
+                    paths = scan_local_rule_paths()
+                    entries = dict(zip(paths, executor.map(load_local_rule_entry, paths)))
+                else:
+                    files = get_github_files(use_cache=False)
+                    entries = dict(zip((file_info["name"] for file_info in files), executor.map(fetch_rule_entry, files)))
+
+            snapshot = RuleSnapshot({key: entry for key, entry in entries.items() if entry}, created_at=time.time())
+            build_seconds = time.time() - start_time
+            publish_rule_snapshot(snapshot, build_seconds)
+            logger.info(f"Kural indeksi oluşturuldu: {len(snapshot.index)} kural ({build_seconds:.2f} saniyede)")
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            rule_index_status.update({"state": "ready" if rule_snapshot else "error", "error": detail})
+            logger.error(f"Kural indeksi oluşturulamadı: {detail}")
+
+# Watcher'dan gelen değişiklikleri uygulama fonksiyonu
+def apply_local_rule_changes(paths: Set[str], full_rescan: bool) -> None:
+    """Yalnızca değişen dosyaları yeniden okuyup dönüştür ve yeni snapshot'ı yayınla"""
+    if full_rescan or rule_snapshot is None:
+        build_rule_index(rescan_if_running=True)
+        return
+
+    with rule_snapshot_lock:
+        start_time = time.time()
+        changes = {path: load_local_rule_entry(path) for path in paths}
+        snapshot = rule_snapshot.with_changes(changes, created_at=time.time())
+        build_seconds = time.time() - start_time
+        publish_rule_snapshot(snapshot, build_seconds)
+
+    removed = sum(1 for entry in changes.values() if entry is None)
+    logger.info(f"Kural dizini güncellendi: {len(changes) - removed} dosya yenilendi, {removed} dosya kaldırıldı ({build_seconds:.2f} saniyede)")
+
+# Paylaşılan kural deposunu mmap ile açma fonksiyonu
+def refresh_rule_store() -> bool:
+    """Depo dosyası yeniyse veya değiştiyse yeniden map et; snapshot değiştiyse True döndür"""
+    current_snapshot = rule_snapshot
+    if isinstance(current_snapshot, MappedRuleStore) and not current_snapshot.is_stale():
+        return False
 
-# Health check endpoint
+    try:
+        start_time = time.time()
+        store = MappedRuleStore(RULE_STORE_PATH)
+    except FileNotFoundError:
+        rule_index_status.update({"state": "waiting_for_store" if current_snapshot is None else "ready"})
+        return False
+    except (OSError, RuleStoreError) as e:
+        rule_index_status.update({"error": str(e)})
+        logger.error(f"Kural deposu açılamadı: {str(e)}")
+        return False
+
+    # Eski mmap açık bırakılır; onu kullanan istekler bitince çöp toplayıcı kapatır
+    publish_rule_snapshot(store, time.time() - start_time)
+    logger.info(f"Kural deposu yüklendi: {RULE_STORE_PATH} ({len(store.index)} kural)")
+    return True
+
+# Depo dosyasını periyodik olarak kontrol eden döngü
+def watch_rule_store() -> None:
+    while True:
+        refresh_rule_store()
+        time.sleep(RULE_STORE_POLL_SECONDS)
+
+# Açılışta snapshot'ı oluştur ve (yerel dizin varsa) izlemeyi başlat
+def start_rule_sources() -> None:
+    global rule_watcher
+    build_rule_index()
+    if RULES_DIR and WATCH_RULES_DIR:
+        rule_watcher = RuleDirectoryWatcher(RULES_DIR, apply_local_rule_changes, RULES_DEBOUNCE_SECONDS)
+        rule_watcher.start()
+
+    # İlk oluşturma başarısızsa (örn. GitHub erişilemiyor veya rate limit) üstel bekleme ile tekrar dene
+    delay = RULE_INDEX_RETRY_SECONDS
+    while rule_snapshot is None:
+        logger.warning(f"Kural indeksi {delay} saniye sonra yeniden denenecek")
+        rule_index_status["retry_in_seconds"] = delay
+        time.sleep(delay)
+        build_rule_index()
+        delay = min(delay * 2, RULE_INDEX_RETRY_MAX_SECONDS)
+    rule_index_status.pop("retry_in_seconds", None)
+
+# Uygulama açılışında warm-up ve indeks oluşturmayı arka planda başlat
+@app.on_event("startup")
+async def start_rule_index_build():
+    startup_timings.setdefault("app_startup", time.perf_counter() - MODULE_LOAD_START)
+    threading.Thread(target=warm_up_backend, name="sigma-warm-up", daemon=True).start()
+    if RULE_STORE_PATH:
+        rule_index_status["source"] = f"store:{RULE_STORE_PATH}"
+        refresh_rule_store()
+        threading.Thread(target=watch_rule_store, name="rule-store-watch", daemon=True).start()
+    elif BUILD_INDEX_ON_STARTUP or RULES_DIR:
+        threading.Thread(target=start_rule_sources, name="rule-index-build", daemon=True).start()
+
+# Uygulama kapanışında izlemeyi durdur
+@app.on_event("shutdown")
+async def stop_rule_watcher():
+    if rule_watcher is not None:
+        rule_watcher.stop()
+
+# Hazır olma kontrolü
+def rule_snapshot_expected() -> bool:
+    # GitHub indeksi yalnızca bir hızlandırma; hazır olmaması servisi degraded yapar, unready değil
+    return bool(RULE_STORE_PATH or RULES_DIR)
+
+def get_readiness_checks() -> Dict[str, bool]:
+    checks = dict(readiness_checks)
+    if rule_snapshot_expected():
+        checks["rule_snapshot"] = rule_snapshot is not None
+    return checks
+
+def report_startup_if_ready() -> None:
+    """Tüm kontroller ilk kez geçtiğinde açılış süre dağılımını logla"""
+    global startup_reported
+    if not all(get_readiness_checks().values()):
+        return
+    with startup_report_lock:
+        if startup_reported:
+            return
+        startup_reported = True
+    startup_timings["time_to_ready"] = time.perf_counter() - MODULE_LOAD_START
+    breakdown = ", ".join(f"{name}={seconds:.3f}s" for name, seconds in startup_timings.items())
+    logger.info(f"Servis hazır. Açılış süreleri: {breakdown}")
+
+# Warm-up: pySigma modüllerini yükle ve örnek kuralı bir kez dönüştür
+def warm_up_backend() -> None:
+    try:
+        get_sigma_modules()
+        start_time = time.perf_counter()
+        convert_sigma_rule_text(EXAMPLE_SIGMA_RULE, {})
+        startup_timings.setdefault("backend_warm_up", time.perf_counter() - start_time)
+        readiness_checks["backend_warm"] = True
+        report_startup_if_ready()
+    except Exception as e:
+        logger.error(f"Warm-up başarısız: {str(e)}")
+
+# Health check endpoint (liveness: her zaman hemen yanıt verir)
 @app.get("/health")
 async def health_check():
     """API sağlık durumu kontrolü"""
-    return {"status": "healthy", "service": "sigma-to-splunk-converter"}
+    return {"status": "healthy", "service": "sigma-to-splunk-converter", "ready": all(get_readiness_checks().values())}
 
-# Ana dönüştürme endpoint'i
-@app.post("/convert", response_model=SigmaConvertResponse)
-async def convert_sigma_to_splunk(request: SigmaConvertRequest):
+# Liveness endpoint'i
+@app.get("/health/live")
+async def liveness_check():
+    """Process ayakta mı (bağımlılıkları kontrol etmez)"""
+    return {"status": "alive"}
+
+# Readiness endpoint'i
+@app.get("/health/ready")
+async def readiness_check():
+    """Backend, kural indeksi ve önbellekler hazır mı; değilse 503 döner"""
+    checks = get_readiness_checks()
+    ready = all(checks.values())
+    degraded = ready and BUILD_INDEX_ON_STARTUP and not rule_snapshot_expected() and rule_snapshot is None
+    return FastJSONResponse(
+        {
+            "status": ("degraded" if degraded else "ready") if ready else "starting",
+            "checks": checks,
+            "startup_timings": startup_timings,
+            "rule_index": rule_index_status
+        },
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
+# Sigma kural metnini dönüştürme fonksiyonu
+def convert_sigma_rule_text(sigma_rule_text: str, metadata: Dict[str, Any]) -> SigmaConvertResponse:
     """
-    Sigma kuralını Splunk sorgusuna dönüştür
+    Sigma kural metnini Splunk sorgularına dönüştür (endpoint'ler ve watcher tarafından kullanılır)
     
-    Args:
-        request: SigmaConvertRequest - Sigma kuralı ve metadata içeren istek
-        
-    Returns:
-        SigmaConvertResponse - Dönüştürülmüş Splunk sorguları ve bilgiler
+    Raises:
+        HTTPException - Geçersiz YAML/Sigma formatı veya dönüştürme hatası
     """
     
-    logger.info(f"Sigma dönüştürme isteği alındı. Metadata: {request.metadata}")
-    
     try:
         # YAML parse et
         try:
-            sigma_dict = yaml.safe_load(request.sigma_rule)
+            sigma_dict = yaml.safe_load(sigma_rule_text)
             if not sigma_dict:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -231,6 +900,8 @@ async def convert_sigma_to_splunk(request: SigmaConvertRequest):
                 detail=f"YAML parse hatası: {str(e)}"
             )
         
+        SigmaRule, SigmaCollection, SplunkBackend = get_sigma_modules()
+        
         # SigmaRule objesi oluştur
         try:
             sigma_rule = SigmaRule.from_dict(sigma_dict)
@@ -260,6 +931,7 @@ async def convert_sigma_to_splunk(request: SigmaConvertRequest):
         
         # Kural bilgilerini topla
         rule_info = {
+            "id": str(sigma_rule.id) if getattr(sigma_rule, 'id', None) else None,
             "title": getattr(sigma_rule, 'title', 'N/A'),
             "description": getattr(sigma_rule, 'description', 'N/A'),
             "author": getattr(sigma_rule, 'author', 'N/A'),
@@ -276,7 +948,7 @@ async def convert_sigma_to_splunk(request: SigmaConvertRequest):
             message=f"Sigma kuralı başarıyla {len(splunk_queries)} Splunk sorgusuna dönüştürüldü",
             queries=splunk_queries,
             rule_info=rule_info,
-            metadata=request.metadata
+            metadata=metadata
         )
         
     except HTTPException:
@@ -289,6 +961,177 @@ async def convert_sigma_to_splunk(request: SigmaConvertRequest):
             detail=f"Sunucu hatası: {str(e)}"
         )
 
+# Ana dönüştürme endpoint'i
+@app.post("/convert", response_model=SigmaConvertResponse)
+async def convert_sigma_to_splunk(request: SigmaConvertRequest):
+    """
+    Sigma kuralını Splunk sorgusuna dönüştür
+    
+    Args:
+        request: SigmaConvertRequest - Sigma kuralı ve metadata içeren istek
+        
+    Returns:
+        SigmaConvertResponse - Dönüştürülmüş Splunk sorguları ve bilgiler
+    """
+    
+    logger.info(f"Sigma dönüştürme isteği alındı. Metadata: {request.metadata}")
+    
+    return convert_sigma_rule_text(request.sigma_rule, request.metadata)
+
+# Dosya listesinde ID arayan, ilerlemeyi olay olarak üreten fonksiyon
+def iter_rule_search(
+    target_id: str,
+    resume_from: Optional[str],
+    deadline: SearchDeadline
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Aramayı yürüt ve ("progress", stats) olaylarını üret; son olay ("result",
+    {"found_rule", "search_stats"}) veya ("timeout", {"search_stats", "resume_cursor"}) olur.
+
+    Dosyalar isme göre sıralı taranır. resume_cursor son taranan (veya atlanan)
+    dosyanın anahtarını taşır; deadline bir dosyanın indirilmesi sırasında dolarsa
+    o dosya taranmış sayılmaz ve devam edildiğinde yeniden denenir.
+    """
+    target_id = target_id.strip()
+    search_stats: Dict[str, Any] = {
+        "total_files": 0,
+        "searched_files": 0,
+        "skipped_files": 0,
+        "target_id": target_id,
+        "timeout_seconds": deadline.seconds,
+        "resumed": bool(resume_from)
+    }
+
+    def finish(event: str, **payload):
+        search_stats["elapsed_time"] = deadline.elapsed()
+        search_stats["timeout"] = event == "timeout"
+        return event, {"search_stats": search_stats, **payload}
+
+    try:
+        # İndeks hazırsa kuralın dosyasını doğrudan indir
+        current_snapshot = rule_snapshot
+        indexed = current_snapshot.index.get(target_id) if current_snapshot else None
+        if indexed:
+            result = download_and_check_file(
+                {"name": indexed.filename, "download_url": indexed.download_url, "size": indexed.size},
+                target_id,
+                deadline
+            )
+            if result:
+                search_stats.update(total_files=len(current_snapshot), searched_files=1, index_hit=True)
+                logger.info(f"Kural indeksten bulundu: {indexed.filename} ({deadline.elapsed():.2f} saniyede)")
+                yield finish("result", found_rule=result)
+                return
+
+        # Dosya listesini al (GitHub veya yerel kural dizini)
+        files = get_rule_files(deadline)
+    except SearchTimeoutError:
+        logger.warning(f"Arama timeout'a uğradı: {deadline.elapsed():.2f} saniye")
+        yield finish("timeout", resume_cursor=resume_from)
+        return
+
+    search_stats["total_files"] = len(files)
+    search_stats["elapsed_time"] = deadline.elapsed()
+    yield "progress", dict(search_stats)
+
+    resume_cursor = resume_from
+    for file_info in files.iter_from(resume_from):
+        try:
+            content = read_url_text(file_info["download_url"], deadline)
+        except SearchTimeoutError:
+            content = None
+        except Exception as e:
+            if not deadline.expired():
+                search_stats["skipped_files"] += 1
+                resume_cursor = files.name_cursor(file_info["name"])
+                logger.warning(f"Dosya atlandı {file_info['name']}: {str(e)}")
+                search_stats["elapsed_time"] = deadline.elapsed()
+                yield "progress", dict(search_stats)
+                continue
+            content = None
+
+        if content is None:
+            logger.warning(f"Arama timeout'a uğradı: {deadline.elapsed():.2f} saniye")
+            yield finish("timeout", resume_cursor=resume_cursor)
+            return
+
+        search_stats["searched_files"] += 1
+        resume_cursor = files.name_cursor(file_info["name"])
+        result = match_rule_content(file_info, content, target_id)
+        if result:
+            logger.info(f"Kural bulundu: {file_info['name']} ({deadline.elapsed():.2f} saniyede)")
+            yield finish("result", found_rule=result)
+            return
+
+        search_stats["elapsed_time"] = deadline.elapsed()
+        yield "progress", dict(search_stats)
+
+    yield finish("result", found_rule=None)
+
+# Arama olaylarını sonuna kadar tüketen fonksiyon
+def run_rule_search(target_id: str, resume_from: Optional[str], deadline: SearchDeadline) -> Tuple[str, Dict[str, Any]]:
+    """İlerleme olaylarını atla, son olayı (result veya timeout) döndür"""
+    last_event = None
+    for last_event in iter_rule_search(target_id, resume_from, deadline):
+        pass
+    return last_event
+
+# Arama sonucundan yanıt modeli üreten fonksiyon
+def make_search_response(request: SigmaSearchRequest, payload: Dict[str, Any]) -> SigmaSearchResponse:
+    """result olayının içeriğini SigmaSearchResponse'a çevir"""
+    found_rule = payload["found_rule"]
+    search_stats = payload["search_stats"]
+    total_elapsed = search_stats["elapsed_time"]
+
+    if found_rule:
+        return SigmaSearchResponse(
+            success=True,
+            message=f"Kural bulundu: {found_rule['filename']} ({total_elapsed:.2f} saniyede)",
+            found_rule=found_rule if request.include_content else strip_rule_content(found_rule),
+            search_stats=search_stats,
+            metadata=request.metadata
+        )
+    return SigmaSearchResponse(
+        success=False,
+        message=f"ID '{request.target_id}' ile eşleşen kural bulunamadı ({total_elapsed:.2f} saniyede, {search_stats['searched_files']} dosya tarandı)",
+        found_rule=None,
+        search_stats=search_stats,
+        metadata=request.metadata
+    )
+
+# Timeout olayının mesajını üreten fonksiyon
+def search_timeout_detail(payload: Dict[str, Any]) -> Dict[str, Any]:
+    search_stats = payload["search_stats"]
+    return {
+        "message": (
+            f"Arama işlemi {search_stats['timeout_seconds']} saniye timeout'ına uğradı. "
+            f"{search_stats['searched_files']}/{search_stats['total_files']} dosya tarandı."
+        ),
+        "search_stats": search_stats,
+        "resume_cursor": payload["resume_cursor"]
+    }
+
+# Arama isteğinin ön kontrolleri
+def validate_search_request(request: SigmaSearchRequest) -> Optional[SigmaSearchResponse]:
+    """Geçersiz UUID için başarısız yanıtı döndür, geçersiz resume cursor için 400 fırlat"""
+    if not is_valid_uuid(request.target_id.strip()):
+        return SigmaSearchResponse(
+            success=False,
+            message=f"Geçersiz UUID formatı: {request.target_id}",
+            found_rule=None,
+            search_stats={"target_id": request.target_id, "error": "invalid_uuid"},
+            metadata=request.metadata
+        )
+    if request.resume_from:
+        try:
+            FileListing.decode_name_cursor(request.resume_from)
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Geçersiz resume_from: {str(e)}"
+            )
+    return None
+
 # Sigma kural arama endpoint'i
 @app.post("/search-sigma", response_model=SigmaSearchResponse)
 async def search_sigma_rule(request: SigmaSearchRequest):
@@ -296,92 +1139,26 @@ async def search_sigma_rule(request: SigmaSearchRequest):
     GitHub'dan Sigma kurallarını çekip ID'ye göre arama yap
     
     Args:
-        request: SigmaSearchRequest - Aranacak ID ve metadata
+        request: SigmaSearchRequest - Aranacak ID, (opsiyonel) resume cursor ve metadata
         
     Returns:
-        SigmaSearchResponse - Bulunan kural bilgileri
+        SigmaSearchResponse - Bulunan kural bilgileri (süre dolarsa 408 + resume_cursor)
     """
     
     logger.info(f"Sigma kural arama isteği: {request.target_id}")
     
-    # Timeout kontrolü için başlangıç zamanı
-    start_time = time.time()
-    timeout_seconds = 60
+    invalid_response = validate_search_request(request)
+    if invalid_response is not None:
+        return invalid_response
     
     try:
-        # Önce target_id'nin geçerli UUID olup olmadığını kontrol et
-        if not is_valid_uuid(request.target_id.strip()):
-            return SigmaSearchResponse(
-                success=False,
-                message=f"Geçersiz UUID formatı: {request.target_id}",
-                found_rule=None,
-                search_stats={"target_id": request.target_id, "error": "invalid_uuid"},
-                metadata=request.metadata
-            )
-        
-        # GitHub'dan dosya listesi al
-        files = get_github_files()
-        
-        search_stats = {
-            "total_files": len(files),
-            "searched_files": 0,
-            "skipped_files": 0,
-            "target_id": request.target_id,
-            "timeout_seconds": timeout_seconds
-        }
-        
-        found_rule = None
-        
-        # Her dosyayı kontrol et
-        for file_info in files:
-            # Timeout kontrolü
-            elapsed_time = time.time() - start_time
-            if elapsed_time > timeout_seconds:
-                logger.warning(f"Arama timeout'a uğradı: {elapsed_time:.2f} saniye")
-                search_stats["timeout"] = True
-                search_stats["elapsed_time"] = elapsed_time
-                
-                raise HTTPException(
-                    status_code=status.HTTP_408_REQUEST_TIMEOUT,
-                    detail=f"Arama işlemi {timeout_seconds} saniye timeout'ına uğradı. {search_stats['searched_files']}/{search_stats['total_files']} dosya tarandı."
-                )
-            
-            try:
-                result = download_and_check_file(file_info, request.target_id.strip())
-                search_stats["searched_files"] += 1
-                
-                if result:
-                    found_rule = result
-                    logger.info(f"Kural bulundu: {file_info['name']} ({elapsed_time:.2f} saniyede)")
-                    break
-                    
-            except Exception as e:
-                search_stats["skipped_files"] += 1
-                logger.warning(f"Dosya atlandı {file_info['name']}: {str(e)}")
-                continue
-        
-        # Toplam süre bilgisi
-        total_elapsed = time.time() - start_time
-        search_stats["elapsed_time"] = total_elapsed
-        search_stats["timeout"] = False
-        
-        if found_rule:
-            return SigmaSearchResponse(
-                success=True,
-                message=f"Kural bulundu: {found_rule['filename']} ({total_elapsed:.2f} saniyede)",
-                found_rule=found_rule,
-                search_stats=search_stats,
-                metadata=request.metadata
-            )
-        else:
-            return SigmaSearchResponse(
-                success=False,
-                message=f"ID '{request.target_id}' ile eşleşen kural bulunamadı ({total_elapsed:.2f} saniyede, {search_stats['searched_files']} dosya tarandı)",
-                found_rule=None,
-                search_stats=search_stats,
-                metadata=request.metadata
-            )
-            
+        # Ağ çağrıları event loop'u bloklamasın diye arama thread havuzunda çalışır
+        event, payload = await run_in_threadpool(
+            run_rule_search,
+            request.target_id,
+            request.resume_from,
+            SearchDeadline(SEARCH_TIMEOUT_SECONDS)
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -390,6 +1167,64 @@ async def search_sigma_rule(request: SigmaSearchRequest):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Arama hatası: {str(e)}"
         )
+    
+    if event == "timeout":
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail=search_timeout_detail(payload)
+        )
+    return make_search_response(request, payload)
+
+# Server-Sent Events formatında tek olay
+def format_sse(event: str, data: Any) -> bytes:
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dump_json(data) + b"\n\n"
+
+# İlerleme akışlı Sigma kural arama endpoint'i
+@app.post("/search-sigma/stream")
+async def search_sigma_rule_stream(request: SigmaSearchRequest):
+    """
+    /search-sigma ile aynı aramayı Server-Sent Events olarak akıt
+    
+    Olaylar:
+        progress: total_files, searched_files, skipped_files, elapsed_time
+        result: SigmaSearchResponse (kural bulundu veya bulunamadı)
+        timeout: message, search_stats ve aramaya devam etmek için resume_cursor
+        error: detail
+    """
+    
+    logger.info(f"Sigma kural arama isteği (stream): {request.target_id}")
+    
+    invalid_response = validate_search_request(request)
+    
+    def event_stream() -> Iterator[bytes]:
+        if invalid_response is not None:
+            yield format_sse("result", invalid_response.model_dump(mode="json"))
+            return
+        
+        try:
+            for event, payload in iter_rule_search(
+                request.target_id,
+                request.resume_from,
+                SearchDeadline(SEARCH_TIMEOUT_SECONDS)
+            ):
+                if event == "progress":
+                    yield format_sse("progress", payload)
+                elif event == "timeout":
+                    yield format_sse("timeout", search_timeout_detail(payload))
+                else:
+                    yield format_sse("result", make_search_response(request, payload).model_dump(mode="json"))
+        except HTTPException as e:
+            yield format_sse("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            logger.error(f"Arama sırasında hata: {str(e)}")
+            yield format_sse("error", {"status_code": 500, "detail": f"Arama hatası: {str(e)}"})
+    
+    # Senkron generator Starlette tarafından thread havuzunda tüketilir
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # Sigma arama ve dönüştürme kombinasyonu
 @app.post("/search-and-convert")
@@ -404,79 +1239,174 @@ async def search_and_convert_sigma(request: SigmaSearchRequest):
         Combined response - Bulunan kural ve Splunk sorgusu
     """
     
-    # Önce kuralı ara
-    search_result = await search_sigma_rule(request)
+    # Önce kuralı ara (dönüştürme için içerik her zaman gerekli)
+    search_result = await search_sigma_rule(request.copy(update={"include_content": True}))
+    
+    # Yanıtta içerik istenmiyorsa referans ile değiştir
+    search_result_data = search_result.dict()
+    if not request.include_content:
+        search_result_data["found_rule"] = strip_rule_content(search_result_data["found_rule"])
     
     if not search_result.success or not search_result.found_rule:
-        return {
+        return FastJSONResponse({
             "success": False,
             "message": search_result.message,
-            "search_result": search_result.dict(),
+            "search_result": search_result_data,
             "conversion_result": None
-        }
+        })
     
-    # Bulunan kuralı dönüştür
+    # Bulunan kuralı dönüştür (snapshot'ta aynı içerik için hazır dönüşüm varsa onu kullan)
     try:
-        convert_request = SigmaConvertRequest(
-            sigma_rule=search_result.found_rule["content"],
-            metadata=request.metadata
-        )
+        content = search_result.found_rule["content"]
+        current_snapshot = rule_snapshot
+        precomputed = None
+        if current_snapshot is not None:
+            precomputed = current_snapshot.conversions.get(hashlib.sha256(content.encode("utf-8")).hexdigest())
         
-        conversion_result = await convert_sigma_to_splunk(convert_request)
+        if precomputed is not None:
+            conversion_data = {**precomputed, "metadata": request.metadata}
+        else:
+            convert_request = SigmaConvertRequest(
+                sigma_rule=content,
+                metadata=request.metadata
+            )
+            
+            conversion_result = await convert_sigma_to_splunk(convert_request)
+            # jsonable_encoder adımını atlamak için doğrudan JSON uyumlu dict üret
+            conversion_data = conversion_result.model_dump(mode="json")
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "message": f"Kural bulundu ve başarıyla dönüştürüldü",
-            "search_result": search_result.dict(),
-            "conversion_result": conversion_result.dict()
-        }
+            "search_result": search_result_data,
+            "conversion_result": conversion_data
+        })
         
     except Exception as e:
-        return {
+        return FastJSONResponse({
             "success": False,
             "message": f"Kural bulundu ancak dönüştürülemedi: {str(e)}",
-            "search_result": search_result.dict(),
+            "search_result": search_result_data,
             "conversion_result": None
-        }
+        })
 
 # GitHub dosya listesi endpoint'i
 @app.get("/list-sigma-files")
-async def list_sigma_files():
-    """GitHub'daki Sigma dosyalarının listesini döndür"""
+async def list_sigma_files(
+    limit: int = LIST_PAGE_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    prefix: Optional[str] = None,
+    contains: Optional[str] = None,
+    sort: str = "name",
+    order: str = "asc"
+):
+    """
+    GitHub'daki (veya yerel kural dizinindeki) Sigma dosyalarının listesini sayfalı döndür
+    
+    Args:
+        limit: Sayfa başına dosya sayısı (1-1000)
+        cursor: Önceki yanıttaki next_cursor değeri
+        prefix: Dosya adı öneki filtresi (örn. proc_creation_win_powershell)
+        contains: Dosya adında geçmesi gereken metin (büyük/küçük harf duyarsız)
+        sort: Sıralama alanı (name veya size)
+        order: Sıralama yönü (asc veya desc)
+    """
+    if sort not in FileListing.SORT_FIELDS or order not in ("asc", "desc"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Geçersiz sıralama: sort={sort}, order={order} (sort: name|size, order: asc|desc)"
+        )
+    
     try:
-        files = get_github_files()
-        return {
+        files = get_rule_files()
+        page, next_cursor = files.page(
+            limit=max(1, min(limit, LIST_PAGE_MAX_LIMIT)),
+            cursor=cursor,
+            prefix=prefix,
+            contains=contains,
+            sort=sort,
+            descending=order == "desc"
+        )
+        return FastJSONResponse({
             "success": True,
-            "message": f"{len(files)} dosya bulundu",
-            "files": files,
-            "total_count": len(files)
-        }
+            "message": f"{len(files)} dosya bulundu, {len(page)} dosya döndürüldü",
+            "files": page,
+            "total_count": len(files),
+            "returned_count": len(page),
+            "next_cursor": next_cursor
+        })
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Dosya listesi alınamadı: {str(e)}"
         )
 
-# Batch dönüştürme endpoint'i
-@app.post("/convert-batch", response_model=List[SigmaConvertResponse])
-async def convert_batch_sigma_to_splunk(requests: List[SigmaConvertRequest]):
+# Kural ID önek arama endpoint'i
+@app.get("/lookup-rule-id", response_model=RuleLookupResponse)
+async def lookup_rule_id(prefix: str, limit: int = 10, include_titles: bool = True):
     """
-    Birden fazla Sigma kuralını toplu olarak Splunk sorgularına dönüştür
+    Kural ID'sinin başını (veya başlık kelimelerini) kullanarak eşleşen kuralları bul
     
     Args:
-        requests: List[SigmaConvertRequest] - Sigma kuralları listesi
+        prefix: Aranacak önek (örn. UUID'nin ilk 8 karakteri)
+        limit: Döndürülecek en fazla eşleşme sayısı (1-100)
+        include_titles: Başlık kelimelerinde de arama yap
         
     Returns:
-        List[SigmaConvertResponse] - Dönüştürülmüş Splunk sorguları listesi
+        RuleLookupResponse - Sıralanmış eşleşmeler
     """
+    current_snapshot = rule_snapshot
+    if current_snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Kural indeksi henüz hazır değil (durum: {rule_index_status['state']})"
+        )
     
-    logger.info(f"Toplu dönüştürme isteği alındı. {len(requests)} kural")
+    limit = max(1, min(limit, 100))
+    start_time = time.perf_counter()
+    current_index = current_snapshot.index
+    matches = current_index.lookup(prefix, limit=limit, include_titles=include_titles)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
     
+    return RuleLookupResponse(
+        success=bool(matches),
+        message=f"{len(matches)} eşleşme bulundu",
+        prefix=prefix,
+        matches=matches,
+        index_size=len(current_index),
+        elapsed_ms=elapsed_ms
+    )
+
+# Kural indeksi durum endpoint'i
+@app.get("/rule-index/status")
+async def get_rule_index_status():
+    """Kural ID indeksinin durumunu döndür"""
+    return rule_index_status
+
+# Kural indeksini yeniden oluşturma endpoint'i
+@app.post("/rule-index/rebuild", status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_rule_index():
+    """Kural ID indeksini arka planda yeniden oluştur"""
+    if RULE_STORE_PATH:
+        # Worker'lar depoyu oluşturmaz, yalnızca builder'ın yazdığı dosyayı yeniden okur
+        refresh_rule_store()
+        return {"message": "Kural deposu yeniden okundu", "status": rule_index_status}
+    threading.Thread(target=build_rule_index, name="rule-index-build", daemon=True).start()
+    return {"message": "Kural indeksi yeniden oluşturuluyor", "status": rule_index_status}
+
+# Toplu dönüştürme sonuçlarını JSON uyumlu dict olarak üreten fonksiyon
+def convert_batch_results(requests: List[SigmaConvertRequest]) -> List[Dict[str, Any]]:
+    """Her kuralı dönüştür; hatalı kurallar için başarısız sonuç ekle"""
     results = []
     
     for i, request in enumerate(requests):
         try:
-            result = await convert_sigma_to_splunk(request)
+            result = convert_sigma_rule_text(request.sigma_rule, request.metadata)
             results.append(result)
         except HTTPException as e:
             # Hatalı kurallar için hata response'u ekle
@@ -498,7 +1428,119 @@ async def convert_batch_sigma_to_splunk(requests: List[SigmaConvertRequest]):
             )
             results.append(error_response)
     
-    return results
+    # jsonable_encoder ve response_model doğrulamasını atlamak için doğrudan JSON uyumlu dict üret
+    return [result.model_dump(mode="json") for result in results]
+
+# Batch dönüştürme endpoint'i
+@app.post("/convert-batch", response_model=List[SigmaConvertResponse])
+async def convert_batch_sigma_to_splunk(requests: List[SigmaConvertRequest]):
+    """
+    Birden fazla Sigma kuralını toplu olarak Splunk sorgularına dönüştür
+    
+    Args:
+        requests: List[SigmaConvertRequest] - Sigma kuralları listesi
+        
+    Returns:
+        List[SigmaConvertResponse] - Dönüştürülmüş Splunk sorguları listesi
+    """
+    
+    logger.info(f"Toplu dönüştürme isteği alındı. {len(requests)} kural")
+    
+    return FastJSONResponse(convert_batch_results(requests))
+
+# Dönüşüm sonuçlarından birleştirme aşaması girdisi üreten fonksiyon
+def conversion_query_items(conversions: List[Dict[str, Any]]) -> List[QueryItem]:
+    """Her dönüşüm sonucunun sorgularını kural etiketi ve logsource ile eşleştir"""
+    items = []
+    for i, conversion in enumerate(conversions):
+        rule_info = conversion.get("rule_info") or {}
+        metadata = conversion.get("metadata") or {}
+        tag = rule_info.get("id") or metadata.get("rule_id") or rule_info.get("title") or f"rule_{i+1}"
+        source = logsource_key(rule_info.get("logsource"))
+        for query in conversion.get("queries") or []:
+            items.append(QueryItem(tag=str(tag), logsource=source, query=query))
+    return items
+
+# Batch dönüştürme + SPL birleştirme endpoint'i
+@app.post("/convert-batch-merged")
+async def convert_batch_merged(requests: List[SigmaConvertRequest], max_group_size: int = 50):
+    """
+    Kuralları toplu dönüştür, ardından ortak temel aramayı paylaşan sorguları
+    birleştirip tekilleştir
+    
+    Args:
+        requests: List[SigmaConvertRequest] - Sigma kuralları listesi
+        max_group_size: Tek bir birleştirilmiş aramadaki en fazla sorgu sayısı
+        
+    Returns:
+        Dönüşüm sonuçları, planlanacak birleştirilmiş aramalar ve azaltım istatistikleri
+    """
+    
+    logger.info(f"Toplu dönüştürme isteği alındı. {len(requests)} kural")
+    conversions = convert_batch_results(requests)
+    
+    start_time = time.perf_counter()
+    merged = merge_queries(conversion_query_items(conversions), max_group_size=max(1, max_group_size))
+    merged["stats"]["merge_ms"] = (time.perf_counter() - start_time) * 1000
+    
+    logger.info(f"SPL birleştirme: {merged['stats']['input_queries']} sorgu -> {merged['stats']['scheduled_searches']} arama")
+    
+    return FastJSONResponse({
+        "success": True,
+        "message": f"{merged['stats']['input_queries']} sorgu {merged['stats']['scheduled_searches']} aramaya indirildi",
+        "results": conversions,
+        "merged_searches": merged["searches"],
+        "stats": merged["stats"]
+    })
+
+# Kural korpusu sorgu dışa aktarma endpoint'i
+@app.get("/export-queries")
+async def export_queries(merge: bool = False, max_group_size: int = 50):
+    """
+    Snapshot'taki önceden hesaplanmış tüm dönüşümleri dışa aktar (yerel kural dizini
+    veya paylaşılan kural deposu gerekir); merge=True ise sorguları birleştir
+    """
+    precompute_missing_detail = (
+        "Dışa aktarma önceden hesaplanmış dönüşümler gerektirir; GitHub indeksi dönüşüm içermez. "
+        "SIGMA_RULES_DIR ile yerel kural dizini veya yerel dizinden oluşturulmuş bir SIGMA_RULE_STORE kullanın"
+    )
+    if not (RULES_DIR or RULE_STORE_PATH):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=precompute_missing_detail)
+    
+    current_snapshot = rule_snapshot
+    if current_snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Kural indeksi henüz hazır değil (durum: {rule_index_status['state']})"
+        )
+    if len(current_snapshot) and not len(current_snapshot.conversions):
+        # Örn. GitHub'dan oluşturulmuş bir depo: kurallar var ama dönüşüm yok
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=precompute_missing_detail)
+    
+    conversions = [conversion for _, conversion in current_snapshot.conversion_items()]
+    items = conversion_query_items(conversions)
+    
+    if not merge:
+        return FastJSONResponse({
+            "success": True,
+            "message": f"{len(items)} sorgu dışa aktarıldı",
+            "searches": [
+                {"query": item.query, "rule_tags": [item.tag], "strategy": "single", "logsource": item.logsource}
+                for item in items
+            ],
+            "stats": {"input_queries": len(items), "scheduled_searches": len(items)}
+        })
+    
+    start_time = time.perf_counter()
+    merged = merge_queries(items, max_group_size=max(1, max_group_size))
+    merged["stats"]["merge_ms"] = (time.perf_counter() - start_time) * 1000
+    
+    return FastJSONResponse({
+        "success": True,
+        "message": f"{merged['stats']['input_queries']} sorgu {merged['stats']['scheduled_searches']} aramaya indirildi",
+        "searches": merged["searches"],
+        "stats": merged["stats"]
+    })
 
 # Basit UUID kontrol endpoint'i (kullanıcının eklediği)
 @app.post("/check-uuid")
@@ -577,36 +1619,55 @@ async def get_supported_backends():
 @app.get("/example")
 async def get_example_sigma_rule():
     """Örnek Sigma kuralı döndür"""
-    example_rule = """title: Suspicious Process Creation
-description: Detects suspicious process creation events
-status: experimental
-author: Security Team
-date: 2023/01/01
-logsource:
-    category: process_creation
-    product: windows
-detection:
-    selection:
-        Image|endswith: 
-            - '\\cmd.exe'
-            - '\\powershell.exe'
-        CommandLine|contains: 
-            - 'whoami'
-            - 'net user'
-            - 'tasklist'
-    condition: selection
-falsepositives:
-    - Administrative activities
-level: medium
-tags:
-    - attack.discovery
-    - attack.t1057"""
+    example_rule = EXAMPLE_SIGMA_RULE
     
     return {
         "example_sigma_rule": example_rule,
         "description": "Bu örnekte Windows'ta şüpheli process oluşturma olayları tespit edilir"
     }
 
+# Paylaşılan kural deposunu oluşturan builder
+def run_rule_store_builder(path: str, watch: bool) -> int:
+    """
+    Snapshot'ı oluşturup depo dosyasına yaz. watch=True ise yerel kural dizinini
+    izlemeye devam eder ve her değişiklikte depoyu yeniden yazar (sidecar modu).
+    """
+    global rule_store_output, rule_watcher
+    rule_store_output = os.path.abspath(path)
+
+    build_rule_index()
+    if rule_snapshot is None:
+        logger.error(f"Kural deposu oluşturulamadı: {rule_index_status['error']}")
+        return 1
+
+    if not watch:
+        return 0
+
+    if not RULES_DIR:
+        logger.error("--watch yalnızca SIGMA_RULES_DIR tanımlıyken kullanılabilir")
+        return 1
+
+    rule_watcher = RuleDirectoryWatcher(RULES_DIR, apply_local_rule_changes, RULES_DEBOUNCE_SECONDS)
+    rule_watcher.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        rule_watcher.stop()
+    return 0
+
+startup_timings["module_import"] = time.perf_counter() - MODULE_LOAD_START
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sigma to Splunk Converter API")
+    subparsers = parser.add_subparsers(dest="command")
+    build_store_parser = subparsers.add_parser("build-store", help="Worker'lar için paylaşılan kural deposunu oluştur")
+    build_store_parser.add_argument("path", help="Depo dosyası yolu (örn. /dev/shm/sigma_rules.store)")
+    build_store_parser.add_argument("--watch", action="store_true", help="Yerel kural dizinini izleyip depoyu güncel tut")
+    args = parser.parse_args()
+
+    if args.command == "build-store":
+        sys.exit(run_rule_store_builder(args.path, args.watch))
+
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,45 @@
+"""
+Process pool workers for the Streamlit batch mode.
+
+pySigma conversion is pure-Python CPU work, so batches run in worker processes
+instead of threads. Each worker process builds one SplunkBackend in its
+initializer and reuses it for every rule it converts. The module is importable
+on its own so spawned workers do not have to re-run the Streamlit script.
+"""
+
+import yaml
+
+_backend = None
+
+
+def init_worker():
+    """Process pool initializer: build this worker's backend once"""
+    global _backend
+    from sigma.backends.splunk import SplunkBackend
+    _backend = SplunkBackend()
+
+
+def convert_rule_text(sigma_text):
+    """Parse a YAML Sigma rule and convert it with this worker's backend"""
+    from sigma.collection import SigmaCollection
+    from sigma.rule import SigmaRule
+
+    if _backend is None:
+        init_worker()
+
+    sigma_dict = yaml.safe_load(sigma_text)
+    if not isinstance(sigma_dict, dict):
+        raise ValueError("Boş veya geçersiz YAML formatı")
+
+    collection = SigmaCollection([SigmaRule.from_dict(sigma_dict)])
+    return [str(query) for query in _backend.convert(collection)]
+
+
+def convert_uploaded_rule(name, sigma_text):
+    """Batch worker: never raises, returns a result dict for the bundle"""
+    try:
+        return {"file": name, "success": True, "queries": convert_rule_text(sigma_text), "error": None}
+    except yaml.YAMLError as e:
+        return {"file": name, "success": False, "queries": [], "error": f"YAML parse hatası: {str(e)}"}
+    except Exception as e:
+        return {"file": name, "success": False, "queries": [], "error": str(e)}
@@ -0,0 +1,395 @@
+"""
+Sigma kural ID'leri ve başlıkları için sıralı, dizi tabanlı önek (prefix) indeksi,
+kolon tabanlı kompakt dosya listesi ve bunları önceden hesaplanmış dönüşümlerle
+bir arada tutan salt-okunur kural anlık görüntüsü (snapshot).
+
+İndeks ve snapshot bir kez oluşturulur ve sonra yalnızca okunur; güncelleme
+gerektiğinde yenisi oluşturulup referans atomik olarak değiştirilir.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import base64
+import json
+import re
+
+# Başlık kelimelerini ayırmak için kullanılan desen
+TITLE_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+# Kısa öneklerde başlık taramasını sınırlamak için üst sınır
+MAX_TITLE_CANDIDATES = 256
+
+# Başlık eşleşme katmanlarının skorları: başlık sorguyla başlıyor, tam kelime, kelime öneki
+TITLE_MATCH_SCORES = (0.8, 0.7, 0.6)
+
+# Önek aralığının üst sınırı için kullanılan karakter
+_PREFIX_UPPER_BOUND = "\U0010ffff"
+
+
+class RuleRecord(NamedTuple):
+    """İndekslenen tek bir Sigma kuralının özet bilgisi"""
+    rule_id: str
+    title: str
+    filename: str
+    download_url: str
+    size: int = 0
+
+
+class RuleEntry(NamedTuple):
+    """Snapshot içindeki tek bir kural dosyası"""
+    filename: str
+    download_url: str
+    size: int
+    record: Optional[RuleRecord] = None  # ID içermeyen dosyalar için None
+    content_sha256: Optional[str] = None
+    conversion: Optional[Dict[str, Any]] = None  # Önceden hesaplanmış dönüşüm sonucu
+
+
+def _prefix_range(keys: List[str], prefix: str) -> Tuple[int, int]:
+    """Sıralı listede verilen önekle başlayan anahtarların [lo, hi) aralığı"""
+    lo = bisect_left(keys, prefix)
+    hi = bisect_left(keys, prefix + _PREFIX_UPPER_BOUND, lo)
+    return lo, hi
+
+
+class RuleIndex:
+    """
+    Kural ID'leri ve başlık kelimeleri üzerinde ikili arama yapan salt-okunur indeks.
+
+    Anahtarlar küçük harfe çevrilmiş sıralı listelerde, kayıt pozisyonları ise
+    paralel array('I') dizilerinde tutulur; arama sırasında kural içerikleri taranmaz.
+    """
+
+    __slots__ = ("records", "_id_keys", "_id_positions", "_title_keys", "_title_positions")
+
+    def __init__(self, records: Iterable[RuleRecord]):
+        self.records: List[RuleRecord] = [record for record in records if record.rule_id]
+
+        id_order = sorted(range(len(self.records)), key=lambda pos: self.records[pos].rule_id.lower())
+        self._id_keys = [self.records[pos].rule_id.lower() for pos in id_order]
+        self._id_positions = array("I", id_order)
+
+        title_tokens = sorted(
+            (token, pos)
+            for pos, record in enumerate(self.records)
+            for token in set(TITLE_TOKEN_RE.findall(record.title.lower()))
+        )
+        self._title_keys = [token for token, _ in title_tokens]
+        self._title_positions = array("I", [pos for _, pos in title_tokens])
+
+    @classmethod
+    def from_tables(cls, records, id_keys, id_positions, title_keys, title_positions) -> "RuleIndex":
+        """
+        Önceden sıralanmış tablolardan indeks oluştur.
+
+        Tablolar __len__ ve __getitem__ destekleyen herhangi bir dizi olabilir
+        (örn. paylaşılan bellekteki kural deposu üzerindeki görünümler).
+        """
+        index = cls.__new__(cls)
+        index.records = records
+        index._id_keys = id_keys
+        index._id_positions = id_positions
+        index._title_keys = title_keys
+        index._title_positions = title_positions
+        return index
+
+    def __len__(self) -> int:
+        return len(self._id_keys)
+
+    def get(self, rule_id: str) -> Optional[RuleRecord]:
+        """Tam ID eşleşmesi ile kaydı döndür"""
+        key = rule_id.strip().lower()
+        pos = bisect_left(self._id_keys, key)
+        if pos < len(self._id_keys) and self._id_keys[pos] == key:
+            return self.records[self._id_positions[pos]]
+        return None
+
+    def lookup(self, prefix: str, limit: int = 10, include_titles: bool = True) -> List[Dict[str, Any]]:
+        """
+        Önekle eşleşen kuralları sıralı olarak döndür.
+
+        Sıralama: tam ID eşleşmesi, ID öneki eşleşmeleri, ardından başlık kelimesi
+        eşleşmeleri (önce sorguyla başlayan başlıklar, sonra tam kelime, sonra kelime öneki).
+        """
+        query = prefix.strip().lower()
+        if not query or limit <= 0:
+            return []
+
+        matches: List[Dict[str, Any]] = []
+        seen = set()
+
+        lo, hi = _prefix_range(self._id_keys, query)
+        for i in range(lo, min(hi, lo + limit)):
+            pos = self._id_positions[i]
+            seen.add(pos)
+            matches.append(self._match(pos, "id", 1.0 if self._id_keys[i] == query else 0.9))
+
+        if not include_titles or len(matches) >= limit:
+            return matches
+
+        tokens = TITLE_TOKEN_RE.findall(query)
+        if not tokens:
+            return matches
+
+        # Son kelime önek olarak, öncekiler tam kelime olarak eşleşmeli
+        *required, last = tokens
+        lo, hi = _prefix_range(self._title_keys, last)
+        candidates = []
+        for i in range(lo, min(hi, lo + MAX_TITLE_CANDIDATES)):
+            pos = self._title_positions[i]
+            if pos in seen:
+                continue
+            title = self.records[pos].title.lower()
+            if required:
+                title_tokens = TITLE_TOKEN_RE.findall(title)
+                if any(token not in title_tokens for token in required):
+                    continue
+            seen.add(pos)
+            if title.startswith(query):
+                tier = 0
+            elif self._title_keys[i] == last:
+                tier = 1
+            else:
+                tier = 2
+            candidates.append((tier, title, pos))
+
+        # Skor sıralamadaki katmandan türetilir; daha önce gelen eşleşmenin skoru daha düşük olamaz
+        candidates.sort()
+        for tier, _, pos in candidates[:limit - len(matches)]:
+            matches.append(self._match(pos, "title", TITLE_MATCH_SCORES[tier]))
+
+        return matches
+
+    def _match(self, pos: int, matched_on: str, score: float) -> Dict[str, Any]:
+        record = self.records[pos]
+        return {
+            "id": record.rule_id,
+            "title": record.title,
+            "filename": record.filename,
+            "download_url": record.download_url,
+            "matched_on": matched_on,
+            "score": score
+        }
+
+
+class InvalidCursorError(ValueError):
+    """Sayfalama cursor'ı çözülemediğinde veya sıralamayla uyuşmadığında fırlatılır"""
+
+
+class FileListing:
+    """
+    Kural dosyası listesinin kolon tabanlı, kompakt gösterimi.
+
+    Dosya adları tek bir listede, boyutlar array('Q') içinde tutulur; download_url
+    ortak önekleri (örn. GitHub raw dizini) bir kez saklanıp dosya adına eklenerek
+    üretilir. Sıralama düzenleri ilk kullanımda array('I') olarak hesaplanır.
+    """
+
+    __slots__ = ("names", "sizes", "_url_prefixes", "_prefix_ids", "_orders")
+
+    SORT_FIELDS = ("name", "size")
+
+    def __init__(self, files: Iterable[Dict[str, Any]]):
+        self.names: List[str] = []
+        self.sizes = array("Q")
+        self._url_prefixes: List[str] = []
+        self._prefix_ids = array("I")
+        self._orders: Dict[str, array] = {}
+
+        prefix_lookup: Dict[str, int] = {}
+        # Önek id'sinin en üst biti: URL dosya adıyla bitmiyorsa önek tam URL'dir
+        for file_info in sorted(files, key=lambda item: item["name"]):
+            name = file_info["name"]
+            url = file_info["download_url"] or ""
+            if url.endswith(name):
+                prefix, full_url_flag = url[:len(url) - len(name)], 0
+            else:
+                prefix, full_url_flag = url, 1 << 31
+            prefix_id = prefix_lookup.get(prefix)
+            if prefix_id is None:
+                prefix_id = prefix_lookup[prefix] = len(self._url_prefixes)
+                self._url_prefixes.append(prefix)
+            self.names.append(name)
+            self.sizes.append(file_info.get("size") or 0)
+            self._prefix_ids.append(prefix_id | full_url_flag)
+
+    @classmethod
+    def from_columns(cls, names: List[str], sizes: array, url_prefixes: List[str], prefix_ids: array) -> "FileListing":
+        """İsme göre sıralı kolonlardan liste oluştur (örn. paylaşılan kural deposundan)"""
+        listing = cls.__new__(cls)
+        listing.names = names
+        listing.sizes = sizes
+        listing._url_prefixes = url_prefixes
+        listing._prefix_ids = prefix_ids
+        listing._orders = {}
+        return listing
+
+    def columns(self) -> Tuple[List[str], array, List[str], array]:
+        """from_columns ile yeniden kurulabilecek (isimler, boyutlar, URL önekleri, önek id'leri)"""
+        return self.names, self.sizes, self._url_prefixes, self._prefix_ids
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for pos in range(len(self.names)):
+            yield self.item(pos)
+
+    def item(self, pos: int) -> Dict[str, Any]:
+        prefix_id = self._prefix_ids[pos]
+        if prefix_id & (1 << 31):
+            url = self._url_prefixes[prefix_id & ~(1 << 31)]
+        else:
+            url = self._url_prefixes[prefix_id] + self.names[pos]
+        return {"name": self.names[pos], "download_url": url, "size": self.sizes[pos]}
+
+    def _sort_key(self, sort: str):
+        if sort == "size":
+            return lambda pos: (self.sizes[pos], self.names[pos])
+        return lambda pos: self.names[pos]
+
+    def _order(self, sort: str) -> array:
+        order = self._orders.get(sort)
+        if order is None:
+            if sort == "name":
+                # İsimler zaten sıralı tutuluyor
+                order = array("I", range(len(self.names)))
+            else:
+                order = array("I", sorted(range(len(self.names)), key=self._sort_key(sort)))
+            self._orders[sort] = order
+        return order
+
+    @staticmethod
+    def encode_cursor(sort: str, descending: bool, key: Any) -> str:
+        raw = json.dumps([sort, descending, key], ensure_ascii=False, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str, sort: str, descending: bool) -> Any:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            cursor_sort, cursor_descending, key = json.loads(base64.urlsafe_b64decode(padded))
+        except Exception:
+            raise InvalidCursorError("Geçersiz cursor")
+        if cursor_sort != sort or cursor_descending != descending:
+            raise InvalidCursorError("Cursor farklı bir sıralama için oluşturulmuş")
+        return tuple(key) if isinstance(key, list) else key
+
+    def name_cursor(self, name: str) -> str:
+        """İsme göre artan sıralamada verilen dosyadan sonrasını gösteren cursor"""
+        return self.encode_cursor("name", False, name)
+
+    @classmethod
+    def decode_name_cursor(cls, cursor: str) -> str:
+        key = cls.decode_cursor(cursor, "name", False)
+        if not isinstance(key, str):
+            raise InvalidCursorError("Geçersiz cursor")
+        return key
+
+    def iter_from(self, cursor: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """İsme göre artan sırada, cursor'daki dosyadan sonraki dosyaları üret"""
+        start = bisect_right(self.names, self.decode_name_cursor(cursor)) if cursor else 0
+        for pos in range(start, len(self.names)):
+            yield self.item(pos)
+
+    def page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        prefix: Optional[str] = None,
+        contains: Optional[str] = None,
+        sort: str = "name",
+        descending: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Filtrelenmiş ve sıralanmış bir sayfa ile sonraki sayfanın cursor'ını döndür.
+
+        Cursor son döndürülen kaydın sıralama anahtarını taşır (keyset sayfalama);
+        liste yenilense bile sayfalar kaymaz.
+        """
+        if sort not in self.SORT_FIELDS:
+            raise ValueError(f"Geçersiz sıralama alanı: {sort}")
+
+        order = self._order(sort)
+        key_of = self._sort_key(sort)
+        lo, hi = 0, len(order)
+
+        # İsme göre sıralamada önek filtresi doğrudan bir aralığa indirgenir
+        if prefix and sort == "name":
+            lo, hi = _prefix_range(self.names, prefix)
+
+        if cursor:
+            key = self.decode_cursor(cursor, sort, descending)
+            if descending:
+                hi = min(hi, bisect_left(order, key, lo, hi, key=key_of))
+            else:
+                lo = max(lo, bisect_right(order, key, lo, hi, key=key_of))
+
+        positions = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+        contains = contains.lower() if contains else None
+
+        items = []
+        last_pos = None
+        has_more = False
+        for i in positions:
+            pos = order[i]
+            name = self.names[pos]
+            if prefix and not name.startswith(prefix):
+                continue
+            if contains and contains not in name.lower():
+                continue
+            if len(items) == limit:
+                has_more = True
+                break
+            items.append(self.item(pos))
+            last_pos = pos
+
+        next_cursor = None
+        if has_more and last_pos is not None:
+            next_cursor = self.encode_cursor(sort, descending, key_of(last_pos))
+        return items, next_cursor
+
+
+class RuleSnapshot:
+    """
+    Kural dosyaları, ID indeksi, dosya listesi ve dönüşümlerin tutarlı bir görüntüsü.
+
+    Değişiklikler with_changes ile yeni bir snapshot üretir; mevcut snapshot'ı
+    okuyan istekler güncelleme sırasında etkilenmez.
+    """
+
+    __slots__ = ("entries", "index", "files", "conversions", "created_at")
+
+    def __init__(self, entries: Dict[str, RuleEntry], created_at: float):
+        self.entries = entries
+        self.index = RuleIndex(entry.record for _, entry in sorted(entries.items()) if entry.record)
+        self.files = FileListing(
+            {"name": entry.filename, "download_url": entry.download_url, "size": entry.size}
+            for entry in entries.values()
+        )
+        self.conversions = {
+            entry.content_sha256: entry.conversion
+            for entry in entries.values()
+            if entry.content_sha256 and entry.conversion
+        }
+        self.created_at = created_at
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def conversion_items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Önceden hesaplanmış dönüşümleri (dosya adı, dönüşüm) olarak sırayla döndür"""
+        for _, entry in sorted(self.entries.items()):
+            if entry.conversion:
+                yield entry.filename, entry.conversion
+
+    def with_changes(self, changes: Dict[str, Optional[RuleEntry]], created_at: float) -> "RuleSnapshot":
+        """Yalnızca değişen anahtarları güncelleyerek yeni bir snapshot döndür (None = silindi)"""
+        entries = dict(self.entries)
+        for key, entry in changes.items():
+            if entry is None:
+                entries.pop(key, None)
+            else:
+                entries[key] = entry
+        return RuleSnapshot(entries, created_at)
@@ -0,0 +1,329 @@
+"""
+Birden fazla worker process'i arasında paylaşılan, mmap tabanlı salt-okunur kural deposu.
+
+Depo bir kez (ön yükleme yapan ana process veya ayrı bir builder tarafından)
+RuleSnapshot'tan tek bir dosyaya yazılır. Worker'lar dosyayı mmap ile açar; sayfalar
+işletim sisteminin sayfa önbelleğinde paylaşıldığı için worker başına bellek
+kullanımı küçük kalır ve açılışta ısınma gerekmez.
+
+Dosya düzeni (little-endian):
+    HEADER
+    entry tablosu       : entry_count x (offset u64, length u32, record offset u64, record length u32)
+                          -> JSON kayıt ve indeks için ayrılmış ID/başlık/dosya/URL/boyut alanları
+    id tablosu          : id_count x (offset u64, length u32, entry u32), küçük harf ID'ye göre sıralı
+    başlık tablosu      : token_count x (offset u64, length u32, entry u32), kelimeye göre sıralı
+    dönüşüm tablosu     : conversion_count x (sha256 32 byte, entry u32), hash'e göre sıralı
+    dosya listesi       : file_count x boyut u64, file_count x URL önek id u32,
+                          NUL ile ayrılmış dosya adları ve URL önekleri (FileListing kolonları)
+    blob                : UTF-8 anahtarlar ve JSON kayıtlar
+"""
+
+from array import array
+from typing import Any, Dict, Iterator, Optional, Tuple
+import json
+import mmap
+import os
+import struct
+
+from rule_index import TITLE_TOKEN_RE, FileListing, RuleIndex, RuleRecord, RuleSnapshot
+
+STORE_MAGIC = b"SGRS"
+STORE_VERSION = 3
+
+HEADER = struct.Struct("<4sIdIIIIIIII")
+ENTRY_SLOT = struct.Struct("<QIQI")
+RECORD_SEPARATOR = "\x1f"
+KEY_SLOT = struct.Struct("<QII")
+CONVERSION_SLOT = struct.Struct("<32sI")
+NAME_SEPARATOR = "\x00"
+
+
+class RuleStoreError(Exception):
+    """Depo dosyası okunamadığında veya formatı geçersiz olduğunda fırlatılır"""
+
+
+def write_rule_store(snapshot: RuleSnapshot, path: str) -> int:
+    """
+    Snapshot'ı depo dosyasına yaz ve yazılan byte sayısını döndür.
+
+    Dosya önce geçici bir isimle yazılır ve os.replace ile atomik olarak yerine
+    konur; açık mmap'ler eski dosyayı okumaya devam eder.
+    """
+    keys = sorted(snapshot.entries)
+    entries = [snapshot.entries[key] for key in keys]
+
+    blob = bytearray()
+    entry_refs = []
+    for entry in entries:
+        record = entry.record
+        payload = json.dumps({
+            "filename": entry.filename,
+            "download_url": entry.download_url,
+            "size": entry.size,
+            "rule_id": record.rule_id if record else None,
+            "title": record.title if record else None,
+            "content_sha256": entry.content_sha256,
+            "conversion": entry.conversion
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        fields = RECORD_SEPARATOR.join(
+            value.replace(RECORD_SEPARATOR, " ")
+            for value in (
+                record.rule_id if record else "",
+                record.title if record else "",
+                entry.filename,
+                entry.download_url,
+                str(entry.size)
+            )
+        ).encode("utf-8")
+        entry_refs.append((len(blob), len(payload), len(blob) + len(payload), len(fields)))
+        blob += payload
+        blob += fields
+
+    id_keys = sorted(
+        (entry.record.rule_id.lower(), pos)
+        for pos, entry in enumerate(entries)
+        if entry.record and entry.record.rule_id
+    )
+    title_keys = sorted(
+        (token, pos)
+        for pos, entry in enumerate(entries)
+        if entry.record and entry.record.rule_id
+        for token in set(TITLE_TOKEN_RE.findall(entry.record.title.lower()))
+    )
+    conversions = {}
+    for pos, entry in enumerate(entries):
+        if entry.content_sha256 and entry.conversion:
+            conversions.setdefault(bytes.fromhex(entry.content_sha256), pos)
+
+    def add_keys(pairs):
+        refs = []
+        for key, pos in pairs:
+            encoded = key.encode("utf-8")
+            refs.append((len(blob), len(encoded), pos))
+            blob.extend(encoded)
+        return refs
+
+    id_refs = add_keys(id_keys)
+    title_refs = add_keys(title_keys)
+
+    names, sizes, url_prefixes, prefix_ids = snapshot.files.columns()
+    file_section = bytearray(array("Q", sizes).tobytes())
+    file_section += array("I", prefix_ids).tobytes()
+    names_blob = NAME_SEPARATOR.join(names).encode("utf-8")
+    prefixes_blob = NAME_SEPARATOR.join(url_prefixes).encode("utf-8")
+    file_section += names_blob
+    file_section += prefixes_blob
+
+    blob_offset = (
+        HEADER.size
+        + ENTRY_SLOT.size * len(entry_refs)
+        + KEY_SLOT.size * (len(id_refs) + len(title_refs))
+        + CONVERSION_SLOT.size * len(conversions)
+        + len(file_section)
+    )
+
+    out = bytearray(HEADER.pack(
+        STORE_MAGIC, STORE_VERSION, snapshot.created_at,
+        len(entry_refs), len(id_refs), len(title_refs), len(conversions),
+        len(names), len(url_prefixes), len(names_blob), len(prefixes_blob)
+    ))
+    for offset, length, record_offset, record_length in entry_refs:
+        out += ENTRY_SLOT.pack(blob_offset + offset, length, blob_offset + record_offset, record_length)
+    for offset, length, pos in id_refs + title_refs:
+        out += KEY_SLOT.pack(blob_offset + offset, length, pos)
+    for sha, pos in sorted(conversions.items()):
+        out += CONVERSION_SLOT.pack(sha, pos)
+    out += file_section
+    out += blob
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as store_file:
+        store_file.write(out)
+        store_file.flush()
+        os.fsync(store_file.fileno())
+    os.replace(tmp_path, path)
+    return len(out)
+
+
+class _KeyTable:
+    """mmap içindeki sıralı anahtar tablosu üzerinde dizi görünümü (bisect ile kullanılabilir)"""
+
+    __slots__ = ("_mm", "_offset", "_count")
+
+    def __init__(self, mm: mmap.mmap, offset: int, count: int):
+        self._mm = mm
+        self._offset = offset
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def slot(self, i: int):
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return KEY_SLOT.unpack_from(self._mm, self._offset + i * KEY_SLOT.size)
+
+    def __getitem__(self, i: int) -> str:
+        key_offset, key_length, _ = self.slot(i)
+        return self._mm[key_offset:key_offset + key_length].decode("utf-8")
+
+
+class _PositionColumn:
+    """Anahtar tablosundaki entry pozisyonları üzerinde dizi görünümü"""
+
+    __slots__ = ("_table",)
+
+    def __init__(self, table: _KeyTable):
+        self._table = table
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __getitem__(self, i: int) -> int:
+        return self._table.slot(i)[2]
+
+
+class _RecordColumn:
+    """Entry pozisyonundan RuleRecord üreten dizi görünümü"""
+
+    __slots__ = ("_store",)
+
+    def __init__(self, store: "MappedRuleStore"):
+        self._store = store
+
+    def __len__(self) -> int:
+        return self._store.entry_count
+
+    def __getitem__(self, pos: int) -> RuleRecord:
+        return self._store.read_record(pos)
+
+
+class _ConversionLookup:
+    """İçerik hash'inden önceden hesaplanmış dönüşümü bulan sözlük benzeri görünüm"""
+
+    __slots__ = ("_store",)
+
+    def __init__(self, store: "MappedRuleStore"):
+        self._store = store
+
+    def __len__(self) -> int:
+        return self._store.conversion_count
+
+    def get(self, content_sha256: str, default=None) -> Optional[Dict[str, Any]]:
+        store = self._store
+        try:
+            target = bytes.fromhex(content_sha256)
+        except ValueError:
+            return default
+
+        lo, hi = 0, store.conversion_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            sha, pos = CONVERSION_SLOT.unpack_from(store.mm, store.conversion_offset + mid * CONVERSION_SLOT.size)
+            if sha < target:
+                lo = mid + 1
+            elif sha > target:
+                hi = mid
+            else:
+                return store.read_entry(pos)["conversion"]
+        return default
+
+
+class MappedRuleStore:
+    """
+    Depo dosyası üzerinde RuleSnapshot ile aynı okuma arayüzünü sunan mmap görünümü.
+
+    Yalnızca header ve tablo konumları Python nesnesi olarak tutulur; kayıtlar
+    istek anında mmap'ten çözülür.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as store_file:
+            stat = os.fstat(store_file.fileno())
+            if stat.st_size < HEADER.size:
+                raise RuleStoreError(f"Kural deposu çok küçük: {path}")
+            self.mm = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.file_id = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+
+        magic, version = struct.unpack_from("<4sI", self.mm, 0)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            raise RuleStoreError(f"Geçersiz kural deposu formatı: {path}")
+        (
+            _, _, created_at, entry_count, id_count, token_count, conversion_count,
+            self.file_count, self._prefix_count, self._names_length, self._prefixes_length
+        ) = HEADER.unpack_from(self.mm, 0)
+
+        self.created_at = created_at
+        self.entry_count = entry_count
+        self.conversion_count = conversion_count
+        self.entry_offset = HEADER.size
+        id_offset = self.entry_offset + ENTRY_SLOT.size * entry_count
+        token_offset = id_offset + KEY_SLOT.size * id_count
+        self.conversion_offset = token_offset + KEY_SLOT.size * token_count
+        self.files_offset = self.conversion_offset + CONVERSION_SLOT.size * conversion_count
+
+        id_table = _KeyTable(self.mm, id_offset, id_count)
+        token_table = _KeyTable(self.mm, token_offset, token_count)
+        self.index = RuleIndex.from_tables(
+            _RecordColumn(self),
+            id_table,
+            _PositionColumn(id_table),
+            token_table,
+            _PositionColumn(token_table)
+        )
+        self.conversions = _ConversionLookup(self)
+        self._files: Optional[FileListing] = None
+
+    def __len__(self) -> int:
+        return self.entry_count
+
+    def _entry_slot(self, pos: int):
+        if not 0 <= pos < self.entry_count:
+            raise IndexError(pos)
+        return ENTRY_SLOT.unpack_from(self.mm, self.entry_offset + pos * ENTRY_SLOT.size)
+
+    def read_entry(self, pos: int) -> Dict[str, Any]:
+        """Entry'nin tam JSON kaydını (dönüşüm dahil) çöz"""
+        offset, length, _, _ = self._entry_slot(pos)
+        return json.loads(self.mm[offset:offset + length])
+
+    def read_record(self, pos: int) -> RuleRecord:
+        """Yalnızca indeks alanlarını çöz (JSON kayda dokunmadan)"""
+        _, _, offset, length = self._entry_slot(pos)
+        rule_id, title, filename, download_url, size = self.mm[offset:offset + length].decode("utf-8").split(RECORD_SEPARATOR)
+        return RuleRecord(rule_id, title, filename, download_url, int(size))
+
+    @property
+    def files(self) -> FileListing:
+        """Dosya listesi ilk kullanımda depodaki kolonlardan bir kez kurulur (JSON kayıtlar çözülmez)"""
+        if self._files is None:
+            count = self.file_count
+            offset = self.files_offset
+            sizes = array("Q", self.mm[offset:offset + 8 * count])
+            offset += 8 * count
+            prefix_ids = array("I", self.mm[offset:offset + 4 * count])
+            offset += 4 * count
+            names = self.mm[offset:offset + self._names_length].decode("utf-8").split(NAME_SEPARATOR) if count else []
+            offset += self._names_length
+            url_prefixes = (
+                self.mm[offset:offset + self._prefixes_length].decode("utf-8").split(NAME_SEPARATOR)
+                if self._prefix_count else []
+            )
+            self._files = FileListing.from_columns(names, sizes, url_prefixes, prefix_ids)
+        return self._files
+
+    def conversion_items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Önceden hesaplanmış dönüşümleri (dosya adı, dönüşüm) olarak sırayla döndür"""
+        for pos in range(self.entry_count):
+            data = self.read_entry(pos)
+            if data["conversion"]:
+                yield data["filename"], data["conversion"]
+
+    def is_stale(self) -> bool:
+        """Depo dosyası yeniden yazıldıysa True döndür"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_dev, stat.st_ino, stat.st_mtime_ns) != self.file_id
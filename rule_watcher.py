@@ -0,0 +1,109 @@
+"""
+Yerel Sigma kural dizinini izleyen ve değişiklikleri toplu olarak bildiren watcher.
+
+watchdog olayları kısa bir süre (debounce) biriktirilir, ardından değişen dosya
+yolları tek seferde apply_changes fonksiyonuna iletilir.
+"""
+
+from typing import Callable, Set
+import logging
+import os
+import threading
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+logger = logging.getLogger(__name__)
+
+RULE_FILE_EXTENSIONS = (".yml", ".yaml")
+
+# Dikkate alınan watchdog olay tipleri (opened / closed_no_write yok sayılır)
+WATCHED_EVENT_TYPES = ("created", "modified", "deleted", "moved", "closed")
+
+
+def is_rule_file(path: str) -> bool:
+    """Yolun bir Sigma kural dosyası olup olmadığını kontrol et"""
+    return path.lower().endswith(RULE_FILE_EXTENSIONS)
+
+
+class RuleDirectoryWatcher(FileSystemEventHandler):
+    """
+    Kural dizinindeki oluşturma, değiştirme, silme ve taşıma olaylarını izler.
+
+    apply_changes(paths, full_rescan) watcher thread'inden çağrılır; dizin silme
+    veya taşıma gibi tek tek dosyalara çözülemeyen olaylarda full_rescan True olur.
+    """
+
+    def __init__(
+        self,
+        rules_dir: str,
+        apply_changes: Callable[[Set[str], bool], None],
+        debounce_seconds: float = 0.5
+    ):
+        super().__init__()
+        self.rules_dir = os.path.abspath(rules_dir)
+        self.apply_changes = apply_changes
+        self.debounce_seconds = debounce_seconds
+        self._pending: Set[str] = set()
+        self._full_rescan = False
+        self._lock = threading.Lock()
+        self._timer = None
+        self._observer = None
+
+    def start(self) -> None:
+        self._observer = Observer()
+        self._observer.schedule(self, self.rules_dir, recursive=True)
+        self._observer.daemon = True
+        self._observer.start()
+        logger.info(f"Kural dizini izleniyor: {self.rules_dir}")
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+
+    def on_any_event(self, event) -> None:
+        if event.event_type not in WATCHED_EVENT_TYPES:
+            return
+
+        paths = [os.fsdecode(event.src_path)]
+        if event.event_type == "moved":
+            paths.append(os.fsdecode(event.dest_path))
+
+        with self._lock:
+            if event.is_directory:
+                if event.event_type in ("deleted", "moved"):
+                    self._full_rescan = True
+                else:
+                    return
+            else:
+                rule_paths = [os.path.abspath(path) for path in paths if is_rule_file(path)]
+                if not rule_paths:
+                    return
+                self._pending.update(rule_paths)
+
+            # Her yeni olayda bekleme süresini yeniden başlat
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce_seconds, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush(self) -> None:
+        with self._lock:
+            paths, self._pending = self._pending, set()
+            full_rescan, self._full_rescan = self._full_rescan, False
+            self._timer = None
+
+        if not paths and not full_rescan:
+            return
+
+        try:
+            self.apply_changes(paths, full_rescan)
+        except Exception as e:
+            logger.error(f"Kural değişiklikleri uygulanamadı: {str(e)}")
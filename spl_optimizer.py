@@ -0,0 +1,269 @@
+"""
+Dönüştürülmüş Splunk sorgularını birleştiren ve tekilleştiren dönüşüm sonrası aşama.
+
+Birleştirme iki adımda yapılır:
+    - Aynı logsource'ta metni tamamen aynı olan sorgular tek aramaya indirilir (dedupe).
+    - Kalan sorgular ortak temel aramaya göre gruplanır: aynı logsource, aynı yüklem
+      yapısı (alan adları, operatörler, parantezler) ve biri hariç tüm yüklemlerde aynı
+      değerler. Konjonktif gruplarda farklılaşan alanın değerleri tek bir
+      `alan IN (...)` listesinde birleştirilir (in_merge); OR veya NOT içeren
+      gruplar yalnızca kendi içinde `(q1) OR (q2) ...` şeklinde birleştirilir (or_merge).
+Birleştirilen aramalara, her olayın hangi kurala ait olduğunu gösteren
+`sigma_rule` alanı `eval` + `searchmatch` ile eklenir.
+
+Gruplama sözlük tabanlıdır ve sorgu uzunluğuyla doğrusal çalışır; binlerce
+kural için tek geçişte tamamlanır.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import re
+
+# Birleştirilmiş tek bir aramaya konulacak en fazla kural sorgusu
+MAX_GROUP_SIZE = 50
+
+# Alan adı, tırnaklı değer, karşılaştırma operatörü, parantez, virgül, '=' ve diğer kelimeler
+SPL_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[<>!]=|[<>]|[(),=]|(?:[^\s(),="<>!]|!(?!=))+')
+
+# Değer listesi olmayan karşılaştırmalar; yapının parçası olarak tutulur, hiç birleştirilmez
+COMPARISON_OPERATORS = ("<=", ">=", "!=", "<", ">")
+
+# Yüklem yapısını (shape) ifade eden işaretçi
+_PREDICATE = "\x00P"
+
+
+class QueryItem(NamedTuple):
+    """Birleştirme aşamasına girecek tek bir sorgu"""
+    tag: str  # Kuralı tanımlayan etiket (örn. kural ID'si)
+    logsource: Tuple[Optional[str], ...]
+    query: str
+
+
+class MergedSearch(NamedTuple):
+    """Birleştirme sonucunda planlanacak tek bir arama"""
+    query: str
+    rule_tags: List[str]
+    strategy: str  # single, dedupe, in_merge, or_merge
+    logsource: Tuple[Optional[str], ...]
+
+
+class _ParsedQuery(NamedTuple):
+    shape: Tuple[Any, ...]
+    fields: List[str]
+    values: List[Tuple[str, ...]]
+    negated: List[bool]
+    has_or: bool
+
+
+def logsource_key(logsource: Any) -> Tuple[Optional[str], ...]:
+    """rule_info içindeki logsource bilgisinden gruplama anahtarı üret"""
+    if isinstance(logsource, dict):
+        return tuple(logsource.get(name) for name in ("category", "product", "service"))
+    return (str(logsource) if logsource else None, None, None)
+
+
+def parse_query(query: str) -> Optional[_ParsedQuery]:
+    """
+    Sorguyu yüklemlere ayır. Yalnızca `alan="v"` ve `alan IN ("a", "b")` yüklemleri
+    değer listesi olarak, geri kalan her şey (AND/OR/NOT, parantezler, `>=` gibi
+    karşılaştırmalar ve değerleri) yapı olarak tutulur.
+    Pipe (|) içeren veya çözümlenemeyen sorgular için None döner.
+    """
+    tokens = SPL_TOKEN_RE.findall(query)
+    if any(token.startswith("|") for token in tokens):
+        return None
+
+    shape: List[Any] = []
+    fields: List[str] = []
+    values: List[Tuple[str, ...]] = []
+    negated: List[bool] = []
+    has_or = False
+
+    # Parantez seviyelerinin NOT altında olup olmadığı
+    negation_stack = [False]
+    pending_not = False
+
+    i = 0
+    count = len(tokens)
+    while i < count:
+        token = tokens[i]
+        upper = token.upper()
+
+        if (
+            i + 2 < count
+            and tokens[i + 1] == "="
+            and tokens[i + 2] not in ("(", ")", ",", "=")
+            and tokens[i + 2] not in COMPARISON_OPERATORS
+        ):
+            field_values: Tuple[str, ...] = (tokens[i + 2],)
+            i += 3
+        elif i + 2 < count and tokens[i + 1].upper() == "IN" and tokens[i + 2] == "(":
+            j = i + 3
+            collected = []
+            while j < count and tokens[j] != ")":
+                if tokens[j] != ",":
+                    collected.append(tokens[j])
+                j += 1
+            if j >= count:
+                return None
+            field_values = tuple(collected)
+            i = j + 1
+        else:
+            if upper == "NOT":
+                pending_not = not pending_not
+            elif token == "(":
+                negation_stack.append(negation_stack[-1] or pending_not)
+                pending_not = False
+            else:
+                if token == ")":
+                    if len(negation_stack) == 1:
+                        return None
+                    negation_stack.pop()
+                elif upper == "OR":
+                    has_or = True
+                pending_not = False
+            shape.append(upper if upper in ("AND", "OR", "NOT") else token)
+            i += 1
+            continue
+
+        shape.append((_PREDICATE, token))
+        fields.append(token)
+        values.append(field_values)
+        negated.append(negation_stack[-1] or pending_not)
+        pending_not = False
+
+    return _ParsedQuery(tuple(shape), fields, values, negated, has_or)
+
+
+def _join_spl(parts: List[str]) -> str:
+    """Parçaları boşlukla birleştir; parantez içlerinde ve karşılaştırma operatörlerinin çevresinde boşluk bırakma"""
+    out = []
+    for part in parts:
+        if out and out[-1] != "(" and part != ")" and out[-1] not in COMPARISON_OPERATORS and part not in COMPARISON_OPERATORS:
+            out.append(" ")
+        out.append(part)
+    return "".join(out)
+
+
+def _searchmatch_tag(query: str, tag: str) -> str:
+    escaped_query = query.replace("\\", "\\\\").replace('"', '\\"')
+    escaped_tag = tag.replace("\\", "\\\\").replace('"', '\\"')
+    return f'if(searchmatch("{escaped_query}"), "{escaped_tag}", null())'
+
+
+def _tag_by_searchmatch(search: str, items: List[QueryItem]) -> str:
+    tags = ", ".join(_searchmatch_tag(item.query, item.tag) for item in items)
+    return f"{search} | eval sigma_rule=mvappend({tags})"
+
+
+def _dedupe_search(duplicates: List[QueryItem]) -> MergedSearch:
+    """Metni aynı sorguları tek aramaya indir"""
+    first = duplicates[0]
+    tags = [item.tag for item in duplicates]
+    if len(duplicates) == 1:
+        return MergedSearch(first.query, tags, "single", first.logsource)
+    quoted_tags = ", ".join('"' + tag.replace("\\", "\\\\").replace('"', '\\"') + '"' for tag in tags)
+    return MergedSearch(f"{first.query} | eval sigma_rule=mvappend({quoted_tags})", tags, "dedupe", first.logsource)
+
+
+def _base_search_groups(
+    units: List[Tuple[List[QueryItem], _ParsedQuery]]
+) -> Iterator[Tuple[List[Tuple[List[QueryItem], _ParsedQuery]], Optional[int]]]:
+    """
+    Aynı yapıdaki tekil sorguları, biri hariç tüm yüklem değerleri aynı olan gruplara ayır.
+
+    (grup, farklılaşan yüklem pozisyonu) üretir; hiçbir grupla eşleşmeyen sorgular
+    (sorgu, None) olarak tek başına döner. En kalabalık gruplar önce seçilir.
+    """
+    buckets: Dict[Tuple[int, Tuple[Tuple[str, ...], ...]], List[int]] = {}
+    for index, (_, parsed) in enumerate(units):
+        for pos in range(len(parsed.values)):
+            base = tuple(parsed.values[:pos] + parsed.values[pos + 1:])
+            buckets.setdefault((pos, base), []).append(index)
+
+    assigned = set()
+    for (pos, _), members in sorted(buckets.items(), key=lambda bucket: -len(bucket[1])):
+        free = [index for index in members if index not in assigned]
+        if len(free) < 2:
+            continue
+        assigned.update(free)
+        yield [units[index] for index in free], pos
+
+    for index, unit in enumerate(units):
+        if index not in assigned:
+            yield [unit], None
+
+
+def _merge_group(units: List[Tuple[List[QueryItem], _ParsedQuery]], pos: Optional[int]) -> MergedSearch:
+    if pos is None or len(units) == 1:
+        return _dedupe_search(units[0][0])
+
+    items = [item for duplicates, _ in units for item in duplicates]
+    tags = [item.tag for item in items]
+    logsource = items[0].logsource
+    first = units[0][1]
+
+    if not first.has_or and not first.negated[pos]:
+        merged_values = list(dict.fromkeys(value for _, parsed in units for value in parsed.values[pos]))
+        predicate = f"{first.fields[pos]} IN ({', '.join(merged_values)})"
+
+        parts = []
+        predicate_index = 0
+        for element in first.shape:
+            if isinstance(element, tuple):
+                if predicate_index == pos:
+                    parts.append(predicate)
+                elif len(first.values[predicate_index]) == 1:
+                    parts.append(f"{element[1]}={first.values[predicate_index][0]}")
+                else:
+                    parts.append(f"{element[1]} IN ({', '.join(first.values[predicate_index])})")
+                predicate_index += 1
+            else:
+                parts.append(element)
+        search = _join_spl(parts)
+        return MergedSearch(_tag_by_searchmatch(search, items), tags, "in_merge", logsource)
+
+    search = " OR ".join(f"({duplicates[0].query})" for duplicates, _ in units)
+    return MergedSearch(_tag_by_searchmatch(search, items), tags, "or_merge", logsource)
+
+
+def merge_queries(items: Iterable[QueryItem], max_group_size: int = MAX_GROUP_SIZE) -> Dict[str, Any]:
+    """
+    Sorguları tekilleştirip ortak temel aramaya göre birleştir ve planlanacak aramalar
+    ile azaltım raporunu döndür.
+    """
+    # Aynı logsource'ta metni tamamen aynı olan sorgular
+    unique: Dict[Tuple[Tuple[Optional[str], ...], str], List[QueryItem]] = {}
+    input_count = 0
+    for item in items:
+        input_count += 1
+        unique.setdefault((item.logsource, item.query), []).append(item)
+
+    searches: List[MergedSearch] = []
+    shapes: Dict[Tuple[Any, ...], List[Tuple[List[QueryItem], _ParsedQuery]]] = {}
+    for (logsource, query), duplicates in unique.items():
+        parsed = parse_query(query)
+        if parsed is None:
+            searches.append(_dedupe_search(duplicates))
+            continue
+        shapes.setdefault((logsource, parsed.shape), []).append((duplicates, parsed))
+
+    for units in shapes.values():
+        for group_units, pos in _base_search_groups(units):
+            for start in range(0, len(group_units), max_group_size):
+                searches.append(_merge_group(group_units[start:start + max_group_size], pos))
+
+    strategies: Dict[str, int] = {}
+    for search in searches:
+        strategies[search.strategy] = strategies.get(search.strategy, 0) + 1
+
+    output_count = len(searches)
+    return {
+        "searches": [search._asdict() for search in searches],
+        "stats": {
+            "input_queries": input_count,
+            "scheduled_searches": output_count,
+            "saved_searches": input_count - output_count,
+            "reduction_ratio": (1 - output_count / input_count) if input_count else 0.0,
+            "strategies": strategies
+        }
+    }
@@ -2,47 +2,240 @@ import streamlit as st
 from sigma.rule import SigmaRule
 from sigma.collection import SigmaCollection
 from sigma.backends.splunk import SplunkBackend
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+import batch_converter
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+import zipfile
 import yaml
 
+# Cache and batch settings
+CONVERSION_CACHE_MAX_ENTRIES = 5000
+BATCH_MAX_WORKERS = min(8, os.cpu_count() or 1)
+RULE_FILE_EXTENSIONS = (".yml", ".yaml")
+
 st.set_page_config(page_title="Sigma to Splunk", layout="wide")
 st.title("Sigma → Splunk Query Converter")
 st.text("by venoox")
 
-sigma_input = st.text_area("Sigma Kuralını Yapıştır", height=300, help="YAML formatında Sigma kuralını buraya yapıştırın")
 
-if st.button("Splunk Query Oluştur"):
-    if not sigma_input.strip():
-        st.warning("Lütfen bir Sigma kuralı girin.")
+class ConversionCache:
+    """Thread-safe LRU cache of Splunk queries keyed by the SHA-256 of the rule text"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, rule_hash):
+        with self._lock:
+            queries = self._entries.get(rule_hash)
+            if queries is not None:
+                self._entries.move_to_end(rule_hash)
+            return queries
+
+    def put(self, rule_hash, queries):
+        with self._lock:
+            self._entries[rule_hash] = queries
+            self._entries.move_to_end(rule_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+@st.cache_resource
+def get_splunk_backend():
+    # Shared by every session; conversions on it are serialized with the lock below
+    return SplunkBackend(), threading.Lock()
+
+
+@st.cache_resource
+def get_conversion_cache():
+    return ConversionCache(CONVERSION_CACHE_MAX_ENTRIES)
+
+
+@st.cache_resource
+def get_batch_pool():
+    # Conversion is CPU-bound, so batches use processes; each worker builds its backend once
+    return ProcessPoolExecutor(
+        max_workers=BATCH_MAX_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=batch_converter.init_worker
+    )
+
+
+def rule_hash(sigma_text):
+    return hashlib.sha256(sigma_text.encode("utf-8")).hexdigest()
+
+
+def convert_sigma_text(sigma_text, backend, cache, backend_lock=None):
+    """Parse a YAML Sigma rule and convert it to Splunk queries, using the hash cache"""
+    key = rule_hash(sigma_text)
+    queries = cache.get(key)
+    if queries is not None:
+        return queries
+
+    sigma_dict = yaml.safe_load(sigma_text) #converts to dict like {"logsource":...,"detection":....}
+    if not isinstance(sigma_dict, dict):
+        raise ValueError("Boş veya geçersiz YAML formatı")
+
+    collection = SigmaCollection([SigmaRule.from_dict(sigma_dict)])
+    if backend_lock is not None:
+        with backend_lock:
+            queries = [str(query) for query in backend.convert(collection)]
     else:
+        queries = [str(query) for query in backend.convert(collection)]
+
+    cache.put(key, queries)
+    return queries
+
+
+def convert_batch(rules, cache, on_progress):
+    """Convert (name, text) pairs, answering cached rules locally and the rest in the process pool"""
+    results = []
+    pending = []
+    for name, text in rules:
+        key = rule_hash(text)
+        queries = cache.get(key)
+        if queries is not None:
+            results.append({"file": name, "success": True, "queries": queries, "error": None})
+            on_progress(len(results))
+        else:
+            pending.append((name, text, key))
+
+    if pending:
+        pool = get_batch_pool()
         try:
-            # Parse the YAML input
-            sigma_dict = yaml.safe_load(sigma_input) #converts to dict like {"logsource":...,"detection":....}
-            
-            # Create SigmaRule object
-            sigma_rule = SigmaRule.from_dict(sigma_dict)
-
-            # Create SigmaCollection with the rule
-            collection = SigmaCollection([sigma_rule])
-            
-            # Create Splunk backend
-            backend = SplunkBackend() #this is a class for convert
-            
-            # Convert collection to Splunk queries
-            queries = backend.convert(collection) #converting sigma to spl
-            
-            # Display results
-            st.success("✅ Sigma kuralı başarıyla Splunk sorgusuna dönüştürüldü!")
-            
-            for i, query in enumerate(queries, 1): #getting query with index like this -> 1 query \n 2 query
-                st.subheader(f"Splunk Query {i}:")
-                st.code(query, language='splunk')
-                
-                # Add copy to clipboard functionality using st.text_area (readonly)
-                st.text_area(f"Query {i}:", value=str(query), height=100, key=f"copy_area_{i}")
-
-        except yaml.YAMLError as e:
-            st.error(f"YAML parse hatası: {str(e)}")
-        except Exception as e:
-            st.error(f"Hata oluştu: {str(e)}")
-            st.error("Lütfen Sigma kuralının doğru YAML formatında olduğundan emin olun.")
-            
\ No newline at end of file
+            futures = {
+                pool.submit(batch_converter.convert_uploaded_rule, name, text): key
+                for name, text, key in pending
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                if result["success"]:
+                    cache.put(futures[future], result["queries"])
+                results.append(result)
+                on_progress(len(results))
+        except BrokenProcessPool:
+            # A crashed worker breaks the pool; drop it so the next batch starts a fresh one
+            get_batch_pool.clear()
+            raise
+
+    return results
+
+
+def read_uploaded_rules(uploaded_files):
+    """Collect (name, text) pairs from uploaded YAML files and zipped rule folders"""
+    rules = []
+    for uploaded in uploaded_files:
+        data = uploaded.getvalue()
+        if uploaded.name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for member in archive.namelist():
+                    if member.lower().endswith(RULE_FILE_EXTENSIONS) and not member.startswith("__MACOSX/"):
+                        rules.append((member, archive.read(member).decode("utf-8", errors="replace")))
+        else:
+            rules.append((uploaded.name, data.decode("utf-8", errors="replace")))
+    return rules
+
+
+def build_result_bundle(results):
+    """Zip archive with one .spl file per converted rule and a JSON summary"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for result in results:
+            if result["success"]:
+                base_name = result["file"].rsplit(".", 1)[0]
+                archive.writestr(f"queries/{base_name}.spl", "\n\n".join(result["queries"]))
+        archive.writestr("results.json", json.dumps(results, ensure_ascii=False, indent=2))
+    return buffer.getvalue()
+
+
+single_tab, batch_tab = st.tabs(["Tekil Kural", "Toplu Yükleme"])
+
+with single_tab:
+    sigma_input = st.text_area("Sigma Kuralını Yapıştır", height=300, help="YAML formatında Sigma kuralını buraya yapıştırın")
+
+    if st.button("Splunk Query Oluştur"):
+        if not sigma_input.strip():
+            st.warning("Lütfen bir Sigma kuralı girin.")
+        else:
+            try:
+                # Shared backend + hash cache: repeated rules skip parsing and conversion
+                backend, backend_lock = get_splunk_backend()
+                queries = convert_sigma_text(sigma_input, backend, get_conversion_cache(), backend_lock)
+
+                # Display results
+                st.success("✅ Sigma kuralı başarıyla Splunk sorgusuna dönüştürüldü!")
+
+                for i, query in enumerate(queries, 1): #getting query with index like this -> 1 query \n 2 query
+                    st.subheader(f"Splunk Query {i}:")
+                    st.code(query, language='splunk')
+
+                    # Add copy to clipboard functionality using st.text_area (readonly)
+                    st.text_area(f"Query {i}:", value=str(query), height=100, key=f"copy_area_{i}")
+
+            except yaml.YAMLError as e:
+                st.error(f"YAML parse hatası: {str(e)}")
+            except Exception as e:
+                st.error(f"Hata oluştu: {str(e)}")
+                st.error("Lütfen Sigma kuralının doğru YAML formatında olduğundan emin olun.")
+
+with batch_tab:
+    uploaded_files = st.file_uploader(
+        "Sigma kurallarını veya kural klasörünün zip arşivini yükle",
+        type=["yml", "yaml", "zip"],
+        accept_multiple_files=True,
+        help="Birden fazla .yml dosyası ya da bir klasörün .zip arşivi yüklenebilir"
+    )
+
+    if st.button("Toplu Dönüştür", disabled=not uploaded_files):
+        rules = read_uploaded_rules(uploaded_files)
+        if not rules:
+            st.warning("Yüklenen dosyalarda Sigma kuralı bulunamadı.")
+        else:
+            progress = st.progress(0.0, text=f"0/{len(rules)} kural dönüştürüldü")
+            try:
+                results = convert_batch(
+                    rules,
+                    get_conversion_cache(),
+                    lambda done: progress.progress(done / len(rules), text=f"{done}/{len(rules)} kural dönüştürüldü")
+                )
+            except BrokenProcessPool:
+                st.error("Dönüştürme işlemi beklenmedik şekilde sonlandı, lütfen tekrar deneyin.")
+            else:
+                results.sort(key=lambda result: result["file"])
+                # Keep results across reruns so the download button does not lose them
+                st.session_state["batch_results"] = results
+                st.session_state["batch_bundle"] = build_result_bundle(results)
+
+    results = st.session_state.get("batch_results")
+    if results:
+        succeeded = sum(1 for result in results if result["success"])
+        st.success(f"✅ {succeeded}/{len(results)} kural başarıyla dönüştürüldü")
+
+        st.download_button(
+            "Sonuç paketini indir (.zip)",
+            data=st.session_state["batch_bundle"],
+            file_name="splunk_queries.zip",
+            mime="application/zip",
+            on_click="ignore"
+        )
+
+        st.dataframe(
+            [
+                {
+                    "Dosya": result["file"],
+                    "Durum": "✅" if result["success"] else "❌",
+                    "Sorgu sayısı": len(result["queries"]),
+                    "Hata": result["error"] or ""
+                }
+                for result in results
+            ],
+            use_container_width=True
+        )
@@ -8,6 +8,8 @@ import requests
 import json
 import time
 
+from spl_optimizer import QueryItem, merge_queries
+
 # API base URL
 BASE_URL = "http://localhost:8000"
 
@@ -25,6 +27,22 @@ def test_health_check():
         print(f"❌ Health check hatası: {e}")
     print("-" * 50)
 
+def test_readiness_check():
+    """Readiness endpoint'ini test et"""
+    print("🔄 Readiness testi...")
+    try:
+        response = requests.get(f"{BASE_URL}/health/ready")
+        data = response.json()
+        if response.status_code == 200:
+            print("✅ Servis hazır!")
+        else:
+            print(f"⏳ Servis henüz hazır değil: {data['checks']}")
+        for name, seconds in data['startup_timings'].items():
+            print(f"  - {name}: {seconds:.3f} saniye")
+    except Exception as e:
+        print(f"❌ Readiness hatası: {e}")
+    print("-" * 50)
+
 def test_example_endpoint():
     """Example endpoint'ini test et"""
     print("🔄 Example endpoint testi...")
@@ -184,6 +202,184 @@ def test_backends_endpoint():
         print(f"❌ Backends endpoint hatası: {e}")
     print("-" * 50)
 
+def test_compressed_response():
+    """Büyük yanıtların sıkıştırılarak döndüğünü test et"""
+    print("🔄 Sıkıştırılmış yanıt testi...")
+    try:
+        response = requests.get(
+            f"{BASE_URL}/list-sigma-files",
+            params={"limit": 1000},
+            headers={"Accept-Encoding": "gzip"}
+        )
+        if response.status_code == 200:
+            print("✅ Sıkıştırılmış yanıt testi başarılı!")
+            print(f"Content-Encoding: {response.headers.get('Content-Encoding')}")
+            print(f"Aktarılan boyut: {response.headers.get('Content-Length')} byte")
+            print(f"Açılmış boyut: {len(response.content)} byte")
+        else:
+            print(f"❌ Sıkıştırılmış yanıt testi başarısız: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Sıkıştırılmış yanıt hatası: {e}")
+    print("-" * 50)
+
+def test_lookup_rule_id():
+    """Kural ID önek arama endpoint'ini test et"""
+    print("🔄 Kural ID önek arama testi...")
+    try:
+        response = requests.get(
+            f"{BASE_URL}/lookup-rule-id",
+            params={"prefix": "7efd2c8d", "limit": 5}
+        )
+        if response.status_code == 200:
+            print("✅ Kural ID önek arama başarılı!")
+            data = response.json()
+            print(f"📊 {data['message']} ({data['elapsed_ms']:.3f} ms, indeks: {data['index_size']} kural)")
+            for match in data['matches']:
+                print(f"  - {match['id']} | {match['title']} ({match['matched_on']})")
+        elif response.status_code == 503:
+            print(f"⏳ Kural indeksi henüz hazır değil: {response.json()['detail']}")
+        else:
+            print(f"❌ Kural ID önek arama başarısız: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Kural ID önek arama hatası: {e}")
+    print("-" * 50)
+
+def test_list_pagination():
+    """Sayfalı dosya listesini cursor ile test et"""
+    print("🔄 Sayfalı dosya listesi testi...")
+    try:
+        params = {"limit": 200, "prefix": "proc_creation_win_"}
+        names = []
+        pages = 0
+        while True:
+            response = requests.get(f"{BASE_URL}/list-sigma-files", params=params)
+            if response.status_code != 200:
+                print(f"❌ Sayfalı dosya listesi başarısız: {response.status_code}")
+                break
+            data = response.json()
+            names.extend(item['name'] for item in data['files'])
+            pages += 1
+            if not data['next_cursor']:
+                print("✅ Sayfalı dosya listesi başarılı!")
+                print(f"📊 {pages} sayfada {len(names)} dosya (toplam: {data['total_count']})")
+                print(f"Tekrarsız ve sıralı: {len(set(names)) == len(names) and names == sorted(names)}")
+                break
+            params["cursor"] = data['next_cursor']
+    except Exception as e:
+        print(f"❌ Sayfalı dosya listesi hatası: {e}")
+    print("-" * 50)
+
+def test_search_stream():
+    """İlerleme akışlı (SSE) kural aramasını test et"""
+    print("🔄 SSE kural arama testi...")
+    try:
+        response = requests.post(
+            f"{BASE_URL}/search-sigma/stream",
+            json={"target_id": "7efd2c8d-8b18-45b7-947d-adfe9ed04f61", "include_content": False},
+            stream=True
+        )
+        if response.status_code != 200:
+            print(f"❌ SSE kural arama başarısız: {response.status_code}")
+        else:
+            event = None
+            progress_count = 0
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    data = json.loads(line[len("data: "):])
+                    if event == "progress":
+                        progress_count += 1
+                    elif event == "result":
+                        print("✅ SSE kural arama tamamlandı!")
+                        print(f"📊 {progress_count} ilerleme olayı, {data['message']}")
+                    elif event == "timeout":
+                        print(f"⏳ {data['message']} resume_cursor: {data['resume_cursor']}")
+                    elif event == "error":
+                        print(f"❌ SSE kural arama hatası: {data['detail']}")
+    except Exception as e:
+        print(f"❌ SSE kural arama hatası: {e}")
+    print("-" * 50)
+
+def make_process_rule(title, image, command_line):
+    """Birleştirme testleri için basit process_creation kuralı üret"""
+    return f"""title: {title}
+logsource:
+    category: process_creation
+    product: windows
+detection:
+    selection:
+        Image|endswith: '{image}'
+        CommandLine|contains: '{command_line}'
+    condition: selection
+level: medium"""
+
+def test_spl_merge():
+    """SPL birleştirme aşamasını (sunucu olmadan) test et"""
+    print("🔄 SPL birleştirme testi...")
+    logsource = ("process_creation", "windows", None)
+    items = [
+        QueryItem("r1", logsource, 'Image="*\\cmd.exe" CommandLine="*whoami*"'),
+        QueryItem("r2", logsource, 'Image="*\\cmd.exe" CommandLine="*whoami*"'),
+        QueryItem("r3", logsource, 'Image="*\\cmd.exe" CommandLine="*net user*"'),
+        QueryItem("r4", logsource, 'Image="*\\powershell.exe" CommandLine="*iex*"'),
+        # Karşılaştırmalar (>=, <=, !=) değer listesi değildir, birleştirilmemeli
+        QueryItem("r5", logsource, 'Image="*\\net.exe" Count>=5'),
+        QueryItem("r6", logsource, 'Image="*\\net.exe" Count>=10'),
+    ]
+    merged = merge_queries(items)
+    strategies = {tuple(search["rule_tags"]): search["strategy"] for search in merged["searches"]}
+    expected = {("r1", "r2", "r3"): "in_merge", ("r4",): "single", ("r5",): "single", ("r6",): "single"}
+    queries = [search["query"] for search in merged["searches"]]
+    if strategies == expected and not any("Count> IN" in query for query in queries):
+        print("✅ SPL birleştirme testi başarılı!")
+    else:
+        print(f"❌ SPL birleştirme beklenmeyen sonuç: {strategies}")
+    print(f"📊 {merged['stats']}")
+    print("-" * 50)
+
+def test_convert_batch_merged():
+    """Toplu dönüştürme + SPL birleştirme endpoint'ini test et"""
+    print("🔄 Birleştirilmiş toplu dönüştürme testi...")
+    rules = [
+        {"sigma_rule": make_process_rule("Whoami", "\\cmd.exe", "whoami"), "metadata": {"rule_id": "r1"}},
+        {"sigma_rule": make_process_rule("Whoami Copy", "\\cmd.exe", "whoami"), "metadata": {"rule_id": "r2"}},
+        {"sigma_rule": make_process_rule("Net User", "\\cmd.exe", "net user"), "metadata": {"rule_id": "r3"}},
+        {"sigma_rule": make_process_rule("IEX", "\\powershell.exe", "iex"), "metadata": {"rule_id": "r4"}},
+    ]
+    try:
+        response = requests.post(f"{BASE_URL}/convert-batch-merged", json=rules)
+        if response.status_code == 200:
+            data = response.json()
+            print("✅ Birleştirilmiş toplu dönüştürme başarılı!")
+            print(f"📊 {data['message']} - stratejiler: {data['stats']['strategies']}")
+            for search in data['merged_searches']:
+                print(f"  - {search['strategy']}: {search['rule_tags']}")
+        else:
+            print(f"❌ Birleştirilmiş toplu dönüştürme başarısız: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Birleştirilmiş toplu dönüştürme hatası: {e}")
+    print("-" * 50)
+
+def test_export_queries():
+    """Kural korpusu sorgu dışa aktarma endpoint'ini test et"""
+    print("🔄 Sorgu dışa aktarma testi...")
+    try:
+        response = requests.get(f"{BASE_URL}/export-queries", params={"merge": True})
+        if response.status_code == 200:
+            data = response.json()
+            print("✅ Sorgu dışa aktarma başarılı!")
+            print(f"📊 {data['message']}")
+        elif response.status_code == 503:
+            print(f"⏳ Kural snapshot'ı henüz hazır değil: {response.json()['detail']}")
+        elif response.status_code == 409:
+            print(f"ℹ️ Dışa aktarma bu modda kullanılamaz: {response.json()['detail']}")
+        else:
+            print(f"❌ Sorgu dışa aktarma başarısız: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Sorgu dışa aktarma hatası: {e}")
+    print("-" * 50)
+
 def main():
     """Ana test fonksiyonu"""
     print("🚀 Sigma to Splunk API Test Başlatılıyor...")
@@ -191,10 +387,18 @@ def main():
 
     # Tüm testleri çalıştır
     test_health_check()
+    test_readiness_check()
     test_example_endpoint()
     test_backends_endpoint()
     test_convert_endpoint()
     test_batch_convert()
+    test_spl_merge()
+    test_convert_batch_merged()
+    test_export_queries()
+    test_compressed_response()
+    test_lookup_rule_id()
+    test_list_pagination()
+    test_search_stream()
 
     print("🎉 Tüm testler tamamlandı!")
 